@@ -0,0 +1,117 @@
+import time
+
+import pygame
+
+from controls import LatencyMeter
+
+# Sound playback with predictable latency. pre_init() asks for a small
+# mixer buffer and must run before pygame.init(). AudioManager reserves a
+# fixed pool of channels per effect category, so a burst of move sounds
+# can never take the channel a line clear needs, and decides per category
+# what happens when its pool is busy: "steal" restarts the oldest voice
+# with the new sound, "drop" skips the new one. Retriggers closer together
+# than a category's min_interval are dropped as well.
+#
+# pygame does not expose the mixer's underruns, so report() gives what can
+# be measured: the buffer latency the mixer was asked for, the delay from
+# the triggering input to play() and how many of those exceeded one buffer
+# period (late), plus stolen and dropped voices.
+
+DEFAULT_FREQUENCY = 44100
+DEFAULT_BUFFER = 256
+
+# Category: (channels, policy when busy, min seconds between plays)
+CATEGORIES = {
+    "movement": (2, "steal", 0.02),
+    "drop": (2, "steal", 0.0),
+    "clear": (2, "steal", 0.0),
+    "jingle": (1, "drop", 0.0),
+}
+
+EFFECT_CATEGORIES = {
+    "move": "movement",
+    "rotate": "movement",
+    "drop": "drop",
+    "clear": "clear",
+    "levelup": "jingle",
+    "gameover": "jingle",
+}
+
+def pre_init(buffer=DEFAULT_BUFFER, frequency=DEFAULT_FREQUENCY):
+    pygame.mixer.pre_init(frequency, -16, 2, buffer)
+
+class ChannelPool:
+    def __init__(self, channels, policy, min_interval):
+        self.channels = channels
+        self.started = [0.0] * len(channels)
+        self.policy = policy
+        self.min_interval = min_interval
+        self.last_play = -min_interval
+
+    def pick(self, now):
+        # Index of the channel to play on, or None to drop the sound
+        if now - self.last_play < self.min_interval:
+            return None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return i
+        if self.policy == "steal":
+            return min(range(len(self.channels)), key=self.started.__getitem__)
+        return None
+
+class AudioManager:
+    def __init__(self, sounds, buffer=DEFAULT_BUFFER, categories=CATEGORIES,
+                 effect_categories=EFFECT_CATEGORIES):
+        self.sounds = sounds
+        self.effect_categories = effect_categories
+        frequency = pygame.mixer.get_init()[0]
+        self.buffer_latency = buffer / frequency
+
+        # Reserved channels are never handed out by Sound.play()
+        total = sum(count for count, _, _ in categories.values())
+        if pygame.mixer.get_num_channels() < total:
+            pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)
+        self.pools = {}
+        first = 0
+        for name, (count, policy, min_interval) in categories.items():
+            channels = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+            self.pools[name] = ChannelPool(channels, policy, min_interval)
+            first += count
+
+        self.latency = LatencyMeter()
+        self.played = 0
+        self.late = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def play(self, name, requested_at=None):
+        pool = self.pools[self.effect_categories[name]]
+        now = time.perf_counter()
+        i = pool.pick(now)
+        if i is None:
+            self.dropped += 1
+            return False
+        channel = pool.channels[i]
+        if channel.get_busy():
+            self.stolen += 1
+        channel.play(self.sounds[name])
+        pool.started[i] = pool.last_play = now
+        self.played += 1
+
+        if requested_at is not None:
+            self.latency.press(requested_at)
+            self.latency.presented(now)
+            if now - requested_at > self.buffer_latency:
+                self.late += 1
+        return True
+
+    def report(self):
+        return {
+            "buffer_ms": self.buffer_latency * 1000,
+            "play_ms": self.latency.percentiles(),
+            "played": self.played,
+            "late": self.late,
+            "stolen": self.stolen,
+            "dropped": self.dropped,
+        }
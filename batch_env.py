@@ -0,0 +1,166 @@
+import numpy as np
+
+from engine import (
+    GRID_WIDTH, GRID_HEIGHT, ORIENTATIONS, KICKS,
+    LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP,
+)
+
+# Vectorized environment that advances N independent games in lockstep.
+# Every game is a row in a stack of arrays, and step() resolves moves,
+# gravity, locking, line clears and scoring for all of them with NumPy
+# operations. Boards hold shape_idx + 1 per occupied cell (0 for empty).
+
+NUM_SHAPES = len(ORIENTATIONS)
+
+# Cell offsets per (shape_idx, rotation): every tetromino has 4 cells
+CELLS = np.array([[orientation.cells for orientation in orientations]
+                  for orientations in ORIENTATIONS], dtype=np.int64)
+
+# Kick offsets per (shape_idx, rotation), padded to the longest table
+MAX_KICKS = max(len(kicks) for shape_kicks in KICKS for kicks in shape_kicks)
+KICK_OFFSETS = np.zeros((NUM_SHAPES, 4, MAX_KICKS, 2), dtype=np.int64)
+KICK_VALID = np.zeros((NUM_SHAPES, 4, MAX_KICKS), dtype=bool)
+for shape_idx, shape_kicks in enumerate(KICKS):
+    for rotation, kicks in enumerate(shape_kicks):
+        KICK_OFFSETS[shape_idx, rotation, :len(kicks)] = kicks
+        KICK_VALID[shape_idx, rotation, :len(kicks)] = True
+
+SPAWN_X = np.array([GRID_WIDTH // 2 - orientations[0].width // 2
+                    for orientations in ORIENTATIONS], dtype=np.int64)
+
+class BatchEnv:
+    def __init__(self, num_envs, seed=None):
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        self.index = np.arange(num_envs)
+
+        self.boards = np.zeros((num_envs, GRID_HEIGHT, GRID_WIDTH), dtype=np.int8)
+        self.piece = np.zeros(num_envs, dtype=np.int64)
+        self.next_piece = np.zeros(num_envs, dtype=np.int64)
+        self.rotation = np.zeros(num_envs, dtype=np.int64)
+        self.x = np.zeros(num_envs, dtype=np.int64)
+        self.y = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.level = np.ones(num_envs, dtype=np.int64)
+        self.lines_cleared = np.zeros(num_envs, dtype=np.int64)
+
+        # Score of each game at the moment it ended, valid where step() reported done
+        self.final_score = np.zeros(num_envs, dtype=np.int64)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        count = int(mask.sum())
+        self.boards[mask] = 0
+        self.score[mask] = 0
+        self.level[mask] = 1
+        self.lines_cleared[mask] = 0
+        self.next_piece[mask] = self.rng.integers(0, NUM_SHAPES, count)
+        self.spawn(mask)
+
+    def spawn(self, mask):
+        count = int(mask.sum())
+        self.piece[mask] = self.next_piece[mask]
+        self.next_piece[mask] = self.rng.integers(0, NUM_SHAPES, count)
+        self.rotation[mask] = 0
+        self.x[mask] = SPAWN_X[self.piece[mask]]
+        self.y[mask] = 0
+
+    def fits(self, envs, rotation, x, y):
+        # Test the pieces of the games in envs at the given rotations and positions
+        cells = CELLS[self.piece[envs], rotation]
+        cx = x[:, None] + cells[..., 0]
+        cy = y[:, None] + cells[..., 1]
+        inside = (cx >= 0) & (cx < GRID_WIDTH) & (cy < GRID_HEIGHT)
+        occupied = self.boards[envs[:, None],
+                               np.minimum(np.maximum(cy, 0), GRID_HEIGHT - 1),
+                               np.minimum(np.maximum(cx, 0), GRID_WIDTH - 1)] != 0
+        blocked = ~inside | ((cy >= 0) & occupied)
+        return ~blocked.any(axis=1)
+
+    def try_move(self, envs, dx, dy):
+        # Move the pieces of the games in envs and return the ones that moved
+        x = self.x[envs] + dx
+        y = self.y[envs] + dy
+        ok = self.fits(envs, self.rotation[envs], x, y)
+        moved = envs[ok]
+        self.x[moved] = x[ok]
+        self.y[moved] = y[ok]
+        return moved
+
+    def try_rotate(self, envs):
+        for k in range(MAX_KICKS):
+            envs = envs[KICK_VALID[self.piece[envs], self.rotation[envs], k]]
+            if not len(envs):
+                break
+            offsets = KICK_OFFSETS[self.piece[envs], self.rotation[envs], k]
+            rotation = (self.rotation[envs] + 1) % 4
+            x = self.x[envs] + offsets[:, 0]
+            y = self.y[envs] + offsets[:, 1]
+            ok = self.fits(envs, rotation, x, y)
+            rotated = envs[ok]
+            self.rotation[rotated] = rotation[ok]
+            self.x[rotated] = x[ok]
+            self.y[rotated] = y[ok]
+            envs = envs[~ok]
+
+    def lock(self, mask):
+        # Write locked pieces into their boards
+        envs = np.flatnonzero(mask)
+        cells = CELLS[self.piece[envs], self.rotation[envs]]
+        cx = self.x[envs, None] + cells[..., 0]
+        cy = self.y[envs, None] + cells[..., 1]
+        self.boards[envs[:, None], cy, cx] = (self.piece[envs] + 1)[:, None]
+
+        # Clear full rows by moving every kept row down past the full rows below it
+        full = (self.boards[envs] != 0).all(axis=2)
+        lines = full.sum(axis=1)
+        cleared = lines > 0
+        if cleared.any():
+            rows = envs[cleared]
+            full = full[cleared]
+            full_below = full[:, ::-1].cumsum(axis=1)[:, ::-1] - full
+            dest = np.arange(GRID_HEIGHT) + full_below
+            n, y = np.nonzero(~full)
+            compacted = np.zeros((len(rows), GRID_HEIGHT, GRID_WIDTH), dtype=self.boards.dtype)
+            compacted[n, dest[n, y]] = self.boards[rows[n], y]
+            self.boards[rows] = compacted
+
+        # Scoring and level up every 10 lines
+        self.score[envs] += lines * lines * 100 * self.level[envs]
+        self.lines_cleared[envs] += lines
+        self.level[envs] = np.maximum(self.level[envs], self.lines_cleared[envs] // 10 + 1)
+
+        self.spawn(mask)
+
+    def step(self, actions):
+        # Apply one action per game followed by one gravity tick.
+        # Returns (rewards, dones); finished games are reset in place.
+        actions = np.asarray(actions)
+        score_before = self.score.copy()
+
+        self.try_move(np.flatnonzero(actions == LEFT), -1, 0)
+        self.try_move(np.flatnonzero(actions == RIGHT), 1, 0)
+        self.try_rotate(np.flatnonzero(actions == ROTATE))
+        self.try_move(np.flatnonzero(actions == SOFT_DROP), 0, 1)
+
+        hard_drop = actions == HARD_DROP
+        falling = np.flatnonzero(hard_drop)
+        while len(falling):
+            falling = self.try_move(falling, 0, 1)
+
+        # Gravity: pieces that cannot fall any further lock
+        locked = np.ones(self.num_envs, dtype=bool)
+        locked[self.try_move(np.flatnonzero(~hard_drop), 0, 1)] = False
+        if locked.any():
+            self.lock(locked)
+
+        dones = locked & ~self.fits(self.index, self.rotation, self.x, self.y)
+        rewards = self.score - score_before
+        if dones.any():
+            self.final_score[dones] = self.score[dones]
+            self.reset(dones)
+
+        return rewards, dones
@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+# Render headless: these must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from engine import (
+    GRID_WIDTH, GRID_HEIGHT, COLORS, LEFT, RIGHT, ROTATE, HARD_DROP,
+    GameState, Tetromino, create_board, lock_tetromino, check_lines,
+)
+from bitboard import WALL, BitBoard, create_bitboard
+from placements import enumerate_placements
+
+# Microbenchmarks and scenarios for the game hot paths. Each benchmark
+# takes an iteration count, does its own setup and returns the elapsed
+# nanoseconds of the timed part only. Results are written as JSON so runs
+# can be compared across commits.
+
+BENCHMARKS = []
+
+BACKENDS = {"list": create_board, "bitboard": create_bitboard}
+
+def benchmark(name, number):
+    def register(func):
+        BENCHMARKS.append((name, func, number))
+        return func
+    return register
+
+def near_full_board(factory, clears):
+    # Bottom `clears` rows are full, the rest of the lower half has one hole per row
+    board = factory()
+    rng = random.Random(clears)
+    for y in range(GRID_HEIGHT // 2, GRID_HEIGHT):
+        hole = -1 if y >= GRID_HEIGHT - clears else rng.randrange(GRID_WIDTH)
+        for x in range(GRID_WIDTH):
+            if x != hole:
+                fill_cell(board, x, y)
+    board.rebuild_index()
+    return board
+
+def fill_cell(board, x, y):
+    if isinstance(board, BitBoard):
+        board.rows[y] |= 1 << (x + WALL)
+        board.colors[y * GRID_WIDTH + x] = 1
+    else:
+        board[y][x] = COLORS[0]
+
+def midgame_piece(shape_idx=5):
+    piece = Tetromino(shape_idx)
+    piece.y = 5
+    return piece
+
+def register_backend_benchmarks(backend, factory):
+    @benchmark(f"is_valid_position[{backend}]", 100000)
+    def bench_is_valid_position(number):
+        board = near_full_board(factory, 0)
+        piece = midgame_piece()
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            piece.is_valid_position(board)
+        return time.perf_counter_ns() - start
+
+    @benchmark(f"rotate[{backend}]", 100000)
+    def bench_rotate(number):
+        board = near_full_board(factory, 0)
+        piece = midgame_piece()
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            piece.rotate(board)
+        return time.perf_counter_ns() - start
+
+    @benchmark(f"hard_drop[{backend}]", 10000)
+    def bench_hard_drop(number):
+        board = near_full_board(factory, 0)
+        piece = Tetromino(5)
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            piece.y = 0
+            piece.hard_drop(board)
+        return time.perf_counter_ns() - start
+
+    @benchmark(f"lock_tetromino[{backend}]", 10000)
+    def bench_lock_tetromino(number):
+        boards = [factory() for _ in range(number)]
+        piece = Tetromino(5)
+        piece.y = GRID_HEIGHT - 2
+        start = time.perf_counter_ns()
+        for board in boards:
+            lock_tetromino(board, piece)
+        return time.perf_counter_ns() - start
+
+    for clears in range(5):
+        @benchmark(f"check_lines[{backend},{clears}]", 5000)
+        def bench_check_lines(number, clears=clears):
+            template = near_full_board(factory, clears)
+            boards = [template.copy() for _ in range(number)]
+            start = time.perf_counter_ns()
+            for board in boards:
+                check_lines(board)
+            return time.perf_counter_ns() - start
+
+    @benchmark(f"enumerate_placements[{backend}]", 200)
+    def bench_enumerate_placements(number):
+        board = near_full_board(factory, 0)
+        start = time.perf_counter_ns()
+        for i in range(number):
+            enumerate_placements(board, Tetromino(i % len(COLORS)))
+        return time.perf_counter_ns() - start
+
+    @benchmark(f"snapshot_restore[{backend}]", 10000)
+    def bench_snapshot_restore(number):
+        from snapshot import snapshot, restore
+        state = GameState(0, factory)
+        state.board = near_full_board(factory, 0)
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            restore(state, snapshot(state))
+        return time.perf_counter_ns() - start
+
+    @benchmark(f"random_play_10000_pieces[{backend}]", 1)
+    def bench_random_play(number):
+        rng = random.Random(0)
+        state = GameState(0, factory)
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            for _ in range(10000):
+                for _ in range(rng.randrange(4)):
+                    state.step(ROTATE)
+                move = rng.choice((LEFT, RIGHT))
+                for _ in range(rng.randrange(6)):
+                    state.step(move)
+                state.step(HARD_DROP)
+                if state.game_over:
+                    state.reset()
+        return time.perf_counter_ns() - start
+
+for backend, factory in BACKENDS.items():
+    register_backend_benchmarks(backend, factory)
+
+def rendering_state():
+    state = GameState(0)
+    rng = random.Random(0)
+    for _ in range(20):
+        state.step(rng.choice((LEFT, RIGHT)))
+        state.step(HARD_DROP)
+    return state
+
+@benchmark("draw_board[full]", 500)
+def bench_draw_board_full(number):
+    from render import SCREEN_WIDTH, SCREEN_HEIGHT, Renderer
+    renderer = Renderer(pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)))
+    state = rendering_state()
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        renderer.invalidate()
+        renderer.draw(state)
+    return time.perf_counter_ns() - start
+
+@benchmark("draw_board[piece_moved]", 500)
+def bench_draw_board_piece_moved(number):
+    from render import SCREEN_WIDTH, SCREEN_HEIGHT, Renderer
+    renderer = Renderer(pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)))
+    state = rendering_state()
+    renderer.draw(state)
+    piece = state.current_tetromino
+    start = time.perf_counter_ns()
+    for i in range(number):
+        piece.x = 3 + i % 2
+        renderer.draw(state)
+    return time.perf_counter_ns() - start
+
+@benchmark("batch_env_step[1024]", 50)
+def bench_batch_env(number):
+    import numpy as np
+    from batch_env import BatchEnv
+    env = BatchEnv(1024, seed=0)
+    actions = np.random.default_rng(0).integers(0, 6, (number, env.num_envs))
+    start = time.perf_counter_ns()
+    for step_actions in actions:
+        env.step(step_actions)
+    return time.perf_counter_ns() - start
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return None
+
+def run(filters=(), repeat=5, scale=1.0):
+    results = []
+    for name, func, number in BENCHMARKS:
+        if filters and not any(f in name for f in filters):
+            continue
+        number = max(1, int(number * scale))
+        times = [func(number) / number for _ in range(repeat)]
+        result = {
+            "name": name,
+            "iterations": number,
+            "repeat": repeat,
+            "min_ns": min(times),
+            "median_ns": statistics.median(times),
+            "mean_ns": statistics.mean(times),
+        }
+        results.append(result)
+        print(f"{name:40s} {result['median_ns'] / 1000:12.2f} us", file=sys.stderr)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Tetris hot paths")
+    parser.add_argument("-o", "--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="run a tenth of the iterations")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "results": run(args.filter, args.repeat, 0.1 if args.quick else 1.0),
+    }
+    pygame.quit()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
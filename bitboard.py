@@ -0,0 +1,110 @@
+from engine import GRID_WIDTH, GRID_HEIGHT, COLORS, ORIENTATIONS, Skyline
+
+# Bitboard backend: each row is an int with bit (x + WALL) set for an
+# occupied cell. WALL bits on either side are always set, so a shifted
+# piece mask that leaves the playfield collides with a wall instead of
+# needing bounds checks. Colors live in a separate bytearray holding
+# shape_idx + 1 per cell (0 for empty).
+WALL = 3
+FULL_MASK = (1 << (GRID_WIDTH + 2 * WALL)) - 1
+EMPTY_ROW = FULL_MASK ^ (((1 << GRID_WIDTH) - 1) << WALL)
+
+PALETTE = [0] + COLORS
+
+# Row masks of every shape, rotation and x, already shifted into place.
+# None where the piece would stick out of the playfield, so x never has
+# to be checked against the walls.
+SHIFTED_MASKS = tuple(
+    tuple(tuple(tuple(mask << (x + WALL) for mask in orientation.masks)
+                if x <= GRID_WIDTH - orientation.width else None
+                for x in range(GRID_WIDTH))
+          for orientation in orientations)
+    for orientations in ORIENTATIONS)
+
+class BitBoard(Skyline):
+    def __init__(self):
+        self.rows = [EMPTY_ROW] * GRID_HEIGHT
+        self.colors = bytearray(GRID_WIDTH * GRID_HEIGHT)
+        self.reset_index()
+
+    def cell(self, x, y):
+        return self.rows[y] >> (x + WALL) & 1
+
+    def __len__(self):
+        return GRID_HEIGHT
+
+    def __getitem__(self, y):
+        start = y * GRID_WIDTH
+        return [PALETTE[c] for c in self.colors[start:start + GRID_WIDTH]]
+
+    def __iter__(self):
+        for y in range(GRID_HEIGHT):
+            yield self[y]
+
+    def copy(self):
+        board = BitBoard.__new__(BitBoard)
+        board.rows = self.rows[:]
+        board.colors = self.colors[:]
+        self.copy_index(board)
+        return board
+
+    def fits(self, tetromino):
+        x = tetromino.x
+        if not 0 <= x < GRID_WIDTH:
+            return False
+        masks = SHIFTED_MASKS[tetromino.shape_idx][tetromino.rotation][x]
+        if masks is None:
+            return False
+        y = tetromino.y
+        if y + len(masks) > GRID_HEIGHT:
+            return False
+        if y < 0:
+            # Rows above the board are empty between the walls
+            masks = masks[-y:]
+            y = 0
+        rows = self.rows
+        for mask in masks:
+            if rows[y] & mask:
+                return False
+            y += 1
+        return True
+
+    def place(self, tetromino):
+        orientation = tetromino.orientation
+        rows = self.rows
+        colors = self.colors
+        color = tetromino.shape_idx + 1
+        masks = SHIFTED_MASKS[tetromino.shape_idx][tetromino.rotation][tetromino.x]
+        for dy, mask in enumerate(masks):
+            rows[tetromino.y + dy] |= mask
+        cells = [(tetromino.x + dx, tetromino.y + dy) for dx, dy in orientation.cells]
+        for x, y in cells:
+            colors[y * GRID_WIDTH + x] = color
+        self.index_cells(cells)
+
+    def clear_lines(self):
+        # Full rows are already known from the index
+        lines = sorted(self.full_rows)
+        if not lines:
+            return 0
+
+        rows = self.rows
+        colors = self.colors
+        for y in reversed(lines):
+            del rows[y]
+            del colors[y * GRID_WIDTH:(y + 1) * GRID_WIDTH]
+        rows[0:0] = [EMPTY_ROW] * len(lines)
+        colors[0:0] = bytes(len(lines) * GRID_WIDTH)
+
+        self.index_clear(lines)
+        return len(lines)
+
+def create_bitboard():
+    return BitBoard()
+
+def row_masks(board):
+    # Walled row bitmasks for any board backend
+    if isinstance(board, BitBoard):
+        return tuple(board.rows)
+    return tuple(EMPTY_ROW | sum(1 << (x + WALL) for x, cell in enumerate(row) if cell)
+                 for row in board)
@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import time
+
+from engine import GRID_WIDTH, Tetromino
+from bitboard import WALL, BitBoard, row_masks
+from placements import enumerate_placements
+
+# Autoplay bot. Placements for the current piece are scored with a linear
+# heuristic, the best few (the beam) are expanded with every placement of
+# the next piece, and the first move of the best pair wins. The search is
+# anytime: it checks its deadline between candidates and returns the best
+# result found so far, so a budget is honored even when the whole search
+# would take longer. In the game it runs in a separate process so the
+# render loop never waits on it.
+
+DEFAULT_BUDGET = 0.05
+DEFAULT_BEAM_WIDTH = 8
+
+# Weights for aggregate height, cleared lines, holes and bumpiness
+WEIGHTS = (-0.510066, 0.760666, -0.35663, -0.184483)
+
+def evaluate(board, lines):
+    height, cleared, holes, bumpiness = WEIGHTS
+    return (height * board.total_height + cleared * lines
+            + holes * board.holes() + bumpiness * board.bumpiness)
+
+def board_from_masks(masks):
+    board = BitBoard()
+    board.rows = list(masks)
+    for y, mask in enumerate(masks):
+        for x in range(GRID_WIDTH):
+            if mask >> (x + WALL) & 1:
+                board.colors[y * GRID_WIDTH + x] = 1
+    board.rebuild_index()
+    return board
+
+def search(board, piece, next_shape, deadline, beam_width=DEFAULT_BEAM_WIDTH):
+    # Return (path, depth) for the best placement of `piece` found before
+    # `deadline` (a perf_counter() time), or (None, 0) if there is none
+    scored = []
+    for placement in enumerate_placements(board, piece):
+        scored.append((evaluate(placement.board, placement.lines_cleared), placement))
+    if not scored:
+        return None, 0
+    scored.sort(key=lambda item: item[0], reverse=True)
+    best_path = scored[0][1].path
+    if next_shape is None:
+        return best_path, 1
+
+    # Lookahead with the next piece, best first candidates first
+    best_value = None
+    for _, placement in scored[:beam_width]:
+        if time.perf_counter() >= deadline:
+            break
+        spawn = Tetromino(next_shape)
+        if not placement.board.fits(spawn):
+            continue
+        value = max((evaluate(follow.board, placement.lines_cleared + follow.lines_cleared)
+                     for follow in enumerate_placements(placement.board, spawn)), default=None)
+        if value is not None and (best_value is None or value > best_value):
+            best_value = value
+            best_path = placement.path
+    return best_path, 2 if best_value is not None else 1
+
+def plan(state, budget=DEFAULT_BUDGET, beam_width=DEFAULT_BEAM_WIDTH):
+    # Synchronous search on a GameState, for headless play
+    return search(state.board, state.current_tetromino, state.next_tetromino.shape_idx,
+                  time.perf_counter() + budget, beam_width)[0]
+
+def worker_main(conn, beam_width):
+    # Yield the CPU to the render loop on machines with few cores
+    if hasattr(os, "SCHED_IDLE"):
+        os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+    elif hasattr(os, "nice"):
+        os.nice(10)
+    while True:
+        job = conn.recv()
+        if job is None:
+            return
+        job_id, masks, piece, next_shape, budget = job
+        deadline = time.perf_counter() + budget
+        tetromino = Tetromino(piece[0])
+        tetromino.rotation, tetromino.x, tetromino.y = piece[1:]
+        path, depth = search(board_from_masks(masks), tetromino, next_shape, deadline, beam_width)
+        conn.send((job_id, path, depth))
+
+# Front end for the game loop: request() hands the current position to the
+# worker process, poll() picks up the answer without blocking
+class Autoplayer:
+    def __init__(self, budget=DEFAULT_BUDGET, beam_width=DEFAULT_BEAM_WIDTH):
+        self.budget = budget
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=worker_main, args=(child, beam_width),
+                                               name="autoplay", daemon=True)
+        self.process.start()
+        self.job_id = 0
+        self.piece = None
+        self.pending = False
+        self.depths = [0, 0, 0]
+
+    def request(self, state):
+        piece = state.current_tetromino
+        # Keep the search well inside the time the piece takes to land
+        drop = state.board.drop_distance(piece)
+        budget = min(self.budget, max(drop, 1) * state.fall_speed / 2)
+        self.job_id += 1
+        self.piece = piece
+        self.pending = True
+        self.conn.send((self.job_id, row_masks(state.board),
+                        (piece.shape_idx, piece.rotation, piece.x, piece.y),
+                        state.next_tetromino.shape_idx, budget))
+
+    def needs_request(self, state):
+        return state.current_tetromino is not self.piece and not state.game_over
+
+    def poll(self, state):
+        # The path for the piece last requested once it is ready, else None.
+        # Answers to older requests are discarded, and so is the answer for
+        # a piece that locked (e.g. under gravity) before it arrived.
+        while self.pending and self.conn.poll():
+            job_id, path, depth = self.conn.recv()
+            if job_id == self.job_id:
+                self.pending = False
+                if state.current_tetromino is not self.piece:
+                    return None
+                self.depths[depth] += 1
+                return path or ()
+        return None
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
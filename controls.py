@@ -0,0 +1,62 @@
+from collections import deque
+
+# Held-key handling for the fixed-timestep loop. A key press acts as soon
+# as it arrives; while the key stays down it repeats after a delayed auto
+# shift (DAS) of `das` logic ticks and then every `arr` ticks (auto-repeat
+# rate). Timings are in logic ticks so they do not depend on frame rate.
+
+DEFAULT_DAS = 10
+DEFAULT_ARR = 2
+
+class KeyRepeater:
+    def __init__(self, repeat_keys, das=DEFAULT_DAS, arr=DEFAULT_ARR):
+        self.repeat_keys = set(repeat_keys)
+        self.das = das
+        self.arr = max(1, arr)
+        # Held repeatable key -> tick of its next repeat
+        self.held = {}
+
+    def press(self, key, tick):
+        if key in self.repeat_keys:
+            self.held[key] = tick + self.das
+
+    def release(self, key):
+        self.held.pop(key, None)
+
+    def release_all(self):
+        self.held.clear()
+
+    def update(self, tick):
+        # Keys whose repeat is due on this tick
+        repeats = []
+        for key, due in self.held.items():
+            if tick >= due:
+                repeats.append(key)
+                self.held[key] = tick + self.arr
+        return repeats
+
+    def next_due(self):
+        # Earliest tick with a pending repeat, or None
+        return min(self.held.values()) if self.held else None
+
+class LatencyMeter:
+    # Time from a key press arriving to the frame that shows its result
+    def __init__(self, size=256):
+        self.samples = deque(maxlen=size)
+        self.pending = []
+
+    def press(self, when):
+        self.pending.append(when)
+
+    def presented(self, when):
+        for start in self.pending:
+            self.samples.append(when - start)
+        self.pending.clear()
+
+    def percentiles(self):
+        # (p50, p99) in milliseconds, or None before the first sample
+        if not self.samples:
+            return None
+        samples = sorted(self.samples)
+        n = len(samples)
+        return samples[n // 2] * 1000, samples[min(n - 1, n * 99 // 100)] * 1000
@@ -0,0 +1,407 @@
+import random
+from bisect import bisect_left
+from collections import namedtuple
+
+# Headless Tetris rules: no pygame, no rendering and no audio.
+# tetris.py is a thin front-end that feeds actions into GameState.step()
+# and turns the returned events into sounds.
+
+# Game constants
+GRID_WIDTH = 10
+GRID_HEIGHT = 20
+
+# Colors
+CYAN = (0, 255, 255)    # I piece
+BLUE = (0, 0, 255)      # J piece
+ORANGE = (255, 165, 0)  # L piece
+YELLOW = (255, 255, 0)  # O piece
+GREEN = (0, 255, 0)     # S piece
+PURPLE = (128, 0, 128)  # T piece
+RED = (255, 0, 0)       # Z piece
+
+# Tetromino shapes
+SHAPES = [
+    [[1, 1, 1, 1]],                         # I
+    [[1, 0, 0], [1, 1, 1]],                 # J
+    [[0, 0, 1], [1, 1, 1]],                 # L
+    [[1, 1], [1, 1]],                       # O
+    [[0, 1, 1], [1, 1, 0]],                 # S
+    [[0, 1, 0], [1, 1, 1]],                 # T
+    [[1, 1, 0], [0, 1, 1]]                  # Z
+]
+
+# Tetromino colors
+COLORS = [CYAN, BLUE, ORANGE, YELLOW, GREEN, PURPLE, RED]
+
+# Color -> shape_idx + 1, the compact cell value used by BitBoard and snapshots
+COLOR_INDEX = {color: i + 1 for i, color in enumerate(COLORS)}
+
+# Actions accepted by GameState.step()
+NOOP = 0
+LEFT = 1
+RIGHT = 2
+ROTATE = 3
+SOFT_DROP = 4
+HARD_DROP = 5
+GRAVITY = 6
+
+# Events returned by GameState.step()
+EVENT_MOVE = "move"
+EVENT_ROTATE = "rotate"
+EVENT_DROP = "drop"
+EVENT_CLEAR = "clear"
+EVENT_LEVELUP = "levelup"
+EVENT_GAMEOVER = "gameover"
+
+def rotate_shape(shape):
+    # Transpose the shape matrix and reverse each row to rotate 90 degrees clockwise
+    return [[shape[y][x] for y in range(len(shape) - 1, -1, -1)]
+            for x in range(len(shape[0]))]
+
+def shape_masks(shape):
+    # One bitmask per shape row, bit x set for every filled cell
+    return tuple(sum(1 << x for x, cell in enumerate(row) if cell) for row in shape)
+
+# bottom holds (dx, dy) of the lowest cell in each column the shape covers
+Orientation = namedtuple("Orientation", "shape cells width height masks bottom")
+
+def build_orientations(shape):
+    orientations = []
+    for _ in range(4):
+        cells = tuple((x, y) for y, row in enumerate(shape)
+                      for x, cell in enumerate(row) if cell)
+        bottom = tuple((x, max(y for cx, y in cells if cx == x)) for x in range(len(shape[0])))
+        orientations.append(Orientation(tuple(tuple(row) for row in shape), cells,
+                                        len(shape[0]), len(shape), shape_masks(shape), bottom))
+        shape = rotate_shape(shape)
+    return tuple(orientations)
+
+# All four orientations of every shape, computed once at import
+ORIENTATIONS = tuple(build_orientations(shape) for shape in SHAPES)
+
+# Wall kicks: (dx, dy) offsets tried in order when rotating out of each
+# orientation. (0, 0) always comes first so an unobstructed rotation
+# behaves exactly like a plain rotation.
+BASIC_KICKS = ((0, 0), (-1, 0), (1, 0))
+I_KICKS = ((0, 0), (-1, 0), (1, 0), (-2, 0), (2, 0))
+O_KICKS = ((0, 0),)
+KICKS = tuple((I_KICKS if shape_idx == 0 else O_KICKS if shape_idx == 3 else BASIC_KICKS,) * 4
+              for shape_idx in range(len(SHAPES)))
+
+class Tetromino:
+    __slots__ = ("shape_idx", "rotation", "x", "y")
+
+    def __init__(self, shape_idx=None, rng=random):
+        if shape_idx is None:
+            shape_idx = rng.randint(0, len(SHAPES) - 1)
+        self.shape_idx = shape_idx
+        self.rotation = 0
+        self.x = GRID_WIDTH // 2 - ORIENTATIONS[shape_idx][0].width // 2
+        self.y = 0
+
+    @property
+    def orientation(self):
+        return ORIENTATIONS[self.shape_idx][self.rotation]
+
+    @property
+    def shape(self):
+        return ORIENTATIONS[self.shape_idx][self.rotation].shape
+
+    @property
+    def cells(self):
+        return ORIENTATIONS[self.shape_idx][self.rotation].cells
+
+    @property
+    def masks(self):
+        return ORIENTATIONS[self.shape_idx][self.rotation].masks
+
+    @property
+    def color(self):
+        return COLORS[self.shape_idx]
+
+    def rotate(self, board):
+        rotation, x, y = self.rotation, self.x, self.y
+        self.rotation = (rotation + 1) % 4
+        for dx, dy in KICKS[self.shape_idx][rotation]:
+            self.x = x + dx
+            self.y = y + dy
+            if self.is_valid_position(board):
+                return True
+
+        self.rotation, self.x, self.y = rotation, x, y
+        return False
+
+    def move_left(self, board):
+        self.x -= 1
+        if not self.is_valid_position(board):
+            self.x += 1
+            return False
+        return True
+
+    def move_right(self, board):
+        self.x += 1
+        if not self.is_valid_position(board):
+            self.x -= 1
+            return False
+        return True
+
+    def move_down(self, board):
+        self.y += 1
+        if not self.is_valid_position(board):
+            self.y -= 1
+            return False
+        return True
+
+    def hard_drop(self, board):
+        self.y += board.drop_distance(self)
+
+    def is_valid_position(self, board):
+        return board.fits(self)
+
+# Incrementally maintained skyline index shared by the board backends:
+# per-column heights, per-row fill counts and the rows that just became
+# full. place() updates it in O(piece cells) and clear_lines() in
+# O(rows), which makes drop distance a lookup and holes, bumpiness and
+# aggregate height O(1). Backends provide cell(x, y).
+class Skyline:
+    def reset_index(self):
+        self.heights = [0] * GRID_WIDTH
+        self.row_fill = [0] * GRID_HEIGHT
+        self.full_rows = []
+        self.filled = 0
+        self.total_height = 0
+        self.bumpiness = 0
+
+    def rebuild_index(self):
+        # Recompute everything from the cells, for boards filled by hand
+        self.reset_index()
+        self.index_cells([(x, y) for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH)
+                          if self.cell(x, y)])
+
+    def copy_index(self, board):
+        board.heights = self.heights[:]
+        board.row_fill = self.row_fill[:]
+        board.full_rows = self.full_rows[:]
+        board.filled = self.filled
+        board.total_height = self.total_height
+        board.bumpiness = self.bumpiness
+
+    def index_cells(self, cells):
+        row_fill = self.row_fill
+        heights = self.heights
+        for x, y in cells:
+            row_fill[y] += 1
+            if row_fill[y] == GRID_WIDTH:
+                self.full_rows.append(y)
+            if GRID_HEIGHT - y > heights[x]:
+                self.set_height(x, GRID_HEIGHT - y)
+        self.filled += len(cells)
+
+    def set_height(self, x, height):
+        heights = self.heights
+        old = heights[x]
+        if x > 0:
+            self.bumpiness += abs(height - heights[x - 1]) - abs(old - heights[x - 1])
+        if x < GRID_WIDTH - 1:
+            self.bumpiness += abs(height - heights[x + 1]) - abs(old - heights[x + 1])
+        self.total_height += height - old
+        heights[x] = height
+
+    def index_clear(self, lines):
+        # Called after the full rows in lines (ascending) have been removed
+        row_fill = self.row_fill
+        for y in reversed(lines):
+            del row_fill[y]
+        row_fill[0:0] = [0] * len(lines)
+        self.full_rows = []
+        self.filled -= GRID_WIDTH * len(lines)
+
+        # Each column drops by the cleared rows below its top; a column whose
+        # top row was cleared is rescanned from there down
+        cleared = len(lines)
+        for x, old in enumerate(self.heights):
+            if not old:
+                continue
+            height = old - cleared + bisect_left(lines, GRID_HEIGHT - old)
+            y = GRID_HEIGHT - height
+            while height and not self.cell(x, y):
+                height -= 1
+                y += 1
+            if height != old:
+                self.set_height(x, height)
+
+    def drop_distance(self, tetromino):
+        # How far the tetromino can fall, from the column heights when it is
+        # above the skyline, otherwise by stepping down (e.g. under an overhang)
+        distance = GRID_HEIGHT
+        heights = self.heights
+        for dx, dy in tetromino.orientation.bottom:
+            y = tetromino.y + dy
+            top = GRID_HEIGHT - heights[tetromino.x + dx]
+            if y >= top:
+                return self.scan_drop_distance(tetromino)
+            distance = min(distance, top - 1 - y)
+        return distance
+
+    def scan_drop_distance(self, tetromino):
+        start = tetromino.y
+        while self.fits(tetromino):
+            tetromino.y += 1
+        distance = tetromino.y - 1 - start
+        tetromino.y = start
+        return distance
+
+    def ghost_y(self, tetromino):
+        # Where the tetromino would land if hard dropped
+        return tetromino.y + self.drop_distance(tetromino)
+
+    def aggregate_height(self):
+        return self.total_height
+
+    def holes(self):
+        # Empty cells below the top of their column
+        return self.total_height - self.filled
+
+# Every board backend implements the same API: board[y][x] reads a cell
+# (0 or a color), fits() tests a tetromino, place() writes it,
+# clear_lines() removes full rows and returns how many were cleared and
+# copy() returns an independent board. The Skyline index comes with it.
+class Board(list, Skyline):
+    def __init__(self, rows=()):
+        super().__init__(rows)
+        self.rebuild_index()
+
+    def cell(self, x, y):
+        return self[y][x]
+
+    def copy(self):
+        board = Board.__new__(Board)
+        list.__init__(board, (row[:] for row in self))
+        self.copy_index(board)
+        return board
+
+    def fits(self, tetromino):
+        for dx, dy in tetromino.cells:
+            x = tetromino.x + dx
+            y = tetromino.y + dy
+            # Check if out of bounds
+            if x < 0 or x >= GRID_WIDTH or y >= GRID_HEIGHT:
+                return False
+            # Check if collides with existing blocks
+            if y >= 0 and self[y][x]:
+                return False
+        return True
+
+    def place(self, tetromino):
+        color = tetromino.color
+        cells = [(tetromino.x + dx, tetromino.y + dy) for dx, dy in tetromino.cells]
+        for x, y in cells:
+            self[y][x] = color
+        self.index_cells(cells)
+
+    def clear_lines(self):
+        # Full rows are already known from the index
+        lines_to_clear = sorted(self.full_rows)
+        if not lines_to_clear:
+            return 0
+
+        # Clear lines from bottom to top, then refill from the top so the
+        # remaining indices do not shift while deleting
+        for line in reversed(lines_to_clear):
+            del self[line]
+        for _ in lines_to_clear:
+            self.insert(0, [0 for _ in range(GRID_WIDTH)])
+
+        self.index_clear(lines_to_clear)
+        return len(lines_to_clear)
+
+def create_board():
+    return Board([0 for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT))
+
+def lock_tetromino(board, tetromino):
+    board.place(tetromino)
+    return check_lines(board)
+
+def check_lines(board):
+    return board.clear_lines()
+
+def fall_speed_for_level(level):
+    # Seconds per grid cell
+    return max(0.05, 0.5 - (level - 1) * 0.05)
+
+class GameState:
+    def __init__(self, seed=None, board_factory=create_board):
+        self.board_factory = board_factory
+        # Bumped whenever settled cells change, so renderers can cache the board
+        self.board_version = 0
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        # A seed restarts the piece sequence; without one the current
+        # generator carries on from where it was
+        if seed is not None or not hasattr(self, "rng"):
+            self.seed = seed
+            self.rng = random.Random(seed)
+        self.board = self.board_factory()
+        self.board_version += 1
+        self.current_tetromino = self.new_tetromino()
+        self.next_tetromino = self.new_tetromino()
+        self.score = 0
+        self.level = 1
+        self.lines_cleared = 0
+        self.fall_speed = fall_speed_for_level(self.level)
+        self.game_over = False
+
+    def new_tetromino(self):
+        return Tetromino(rng=self.rng)
+
+    def step(self, action):
+        # Apply one action and return the list of events it produced
+        events = []
+        if self.game_over:
+            return events
+
+        piece = self.current_tetromino
+        if action == LEFT:
+            if piece.move_left(self.board):
+                events.append(EVENT_MOVE)
+        elif action == RIGHT:
+            if piece.move_right(self.board):
+                events.append(EVENT_MOVE)
+        elif action == ROTATE:
+            if piece.rotate(self.board):
+                events.append(EVENT_ROTATE)
+        elif action == SOFT_DROP:
+            piece.move_down(self.board)
+        elif action == HARD_DROP:
+            piece.hard_drop(self.board)
+            events.append(EVENT_DROP)
+            self.lock_piece(events)
+        elif action == GRAVITY:
+            if not piece.move_down(self.board):
+                self.lock_piece(events)
+
+        return events
+
+    def lock_piece(self, events):
+        lines = lock_tetromino(self.board, self.current_tetromino)
+        self.board_version += 1
+        if lines > 0:
+            events.append(EVENT_CLEAR)
+            self.lines_cleared += lines
+            self.score += lines * lines * 100 * self.level
+
+            # Level up every 10 lines
+            new_level = self.lines_cleared // 10 + 1
+            if new_level > self.level:
+                self.level = new_level
+                self.fall_speed = fall_speed_for_level(self.level)
+                events.append(EVENT_LEVELUP)
+
+        self.current_tetromino = self.next_tetromino
+        self.next_tetromino = self.new_tetromino()
+
+        # Check if the new tetromino can be placed
+        if not self.current_tetromino.is_valid_position(self.board):
+            self.game_over = True
+            events.append(EVENT_GAMEOVER)
@@ -0,0 +1,194 @@
+import argparse
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+# Render headless: these must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from engine import GameState
+from render import SCREEN_WIDTH, SCREEN_HEIGHT, Renderer
+from replay import TICKS_PER_SECOND, ReplayError, parse_replay
+
+# Exports a replay as video without a window, as fast as the machine
+# allows. The game is re-simulated tick by tick and drawn into a small
+# pool of offscreen surfaces, each with its own Renderer so incremental
+# redraws stay correct. A writer thread streams each finished surface's
+# pixel buffer straight to ffmpeg's stdin (or a raw file) and hands the
+# surface back, so frames are never copied in Python and memory is
+# bounded by the pool size. Rendering, writing and ffmpeg's encoding all
+# run at the same time.
+
+DEFAULT_FPS = 30
+DEFAULT_SLOTS = 4
+# Seconds the final position stays on screen
+END_HOLD = 1.0
+
+def pixel_format(surface):
+    # ffmpeg rawvideo pixel format matching the surface's bytes in memory
+    names = {}
+    for channel, shift in zip("rgb", surface.get_shifts()):
+        names[shift // 8] = channel
+    order = "".join(names.get(i, "0") for i in range(surface.get_bytesize()))
+    return order if sys.byteorder == "little" else order[::-1]
+
+class RawSink:
+    def __init__(self, path):
+        self.file = open(path, "wb")
+
+    def write(self, data):
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+class FFmpegSink:
+    def __init__(self, path, size, fps, pix_fmt, ffmpeg="ffmpeg"):
+        width, height = size
+        command = [
+            ffmpeg, "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", pix_fmt, "-s", f"{width}x{height}", "-r", str(fps),
+            "-i", "-",
+            "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", path,
+        ]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, data):
+        self.process.stdin.write(data)
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait():
+            raise RuntimeError(f"ffmpeg exited with status {self.process.returncode}")
+
+class FramePipeline:
+    def __init__(self, sink, size=(SCREEN_WIDTH, SCREEN_HEIGHT), slots=DEFAULT_SLOTS):
+        # 32-bit rows have no padding, so a surface buffer is exactly one frame
+        self.surfaces = [pygame.Surface(size, 0, 32) for _ in range(slots)]
+        self.renderers = [Renderer(surface) for surface in self.surfaces]
+        self.sink = sink
+        self.free = queue.Queue()
+        self.ready = queue.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+        self.frames = 0
+        self.error = None
+        self.writer = threading.Thread(target=self.write_frames, name="frame-writer")
+        self.writer.start()
+
+    def submit(self, state, game_over=False):
+        # Blocks only when every slot is still waiting to be written
+        slot = self.free.get()
+        if self.error:
+            raise self.error
+        renderer = self.renderers[slot]
+        renderer.draw(state)
+        if game_over:
+            renderer.draw_game_over()
+        self.ready.put(slot)
+        self.frames += 1
+
+    def write_frames(self):
+        while True:
+            slot = self.ready.get()
+            if slot is None:
+                return
+            try:
+                if not self.error:
+                    # The buffer proxy locks the surface until it is released
+                    view = self.surfaces[slot].get_buffer()
+                    self.sink.write(view)
+                    del view
+            except Exception as e:
+                self.error = e
+            self.free.put(slot)
+
+    def close(self):
+        self.ready.put(None)
+        self.writer.join()
+        self.sink.close()
+        if self.error:
+            raise self.error
+
+def replay_frames(data, fps=DEFAULT_FPS, start=0.0, end=None):
+    # Yield (state, game_over) once per video frame between start and end
+    # seconds, re-simulating every input on the way
+    seed, _, inputs = parse_replay(data)
+    state = GameState(seed)
+    last_tick = inputs[-1][0] if inputs else 0
+    total = (last_tick / TICKS_PER_SECOND) + END_HOLD
+    if end is not None:
+        total = min(total, end)
+
+    i = 0
+    frame = int(start * fps)
+    while frame / fps < total:
+        tick = frame * TICKS_PER_SECOND // fps
+        while i < len(inputs) and inputs[i][0] <= tick:
+            state.step(inputs[i][1])
+            i += 1
+        yield state, state.game_over and i == len(inputs)
+        frame += 1
+
+def export(data, output, fps=DEFAULT_FPS, start=0.0, end=None, slots=DEFAULT_SLOTS):
+    pygame.display.init()
+    pygame.font.init()
+    size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+    probe = pygame.Surface(size, 0, 32)
+    if output.endswith(".raw"):
+        sink = RawSink(output)
+    else:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise SystemExit("ffmpeg not found; use a .raw output instead")
+        sink = FFmpegSink(output, size, fps, pixel_format(probe), ffmpeg)
+
+    pipeline = FramePipeline(sink, size, slots)
+    try:
+        for state, game_over in replay_frames(data, fps, start, end):
+            pipeline.submit(state, game_over)
+    finally:
+        pipeline.close()
+    return pipeline.frames, pixel_format(probe)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a Tetris replay as video")
+    parser.add_argument("replay", help="replay file")
+    parser.add_argument("-o", "--output", required=True,
+                        help="video file for ffmpeg, or .raw for raw frames")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS)
+    parser.add_argument("--start", type=float, default=0.0, help="clip start in seconds")
+    parser.add_argument("--end", type=float, default=None, help="clip end in seconds")
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS,
+                        help="frames in flight between rendering and encoding")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.replay, "rb") as f:
+            data = f.read()
+        started = time.perf_counter()
+        frames, pix_fmt = export(data, args.output, args.fps, args.start, args.end, args.slots)
+    except (OSError, ReplayError) as e:
+        print(f"{args.replay}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        pygame.quit()
+
+    elapsed = time.perf_counter() - started
+    video = frames / args.fps
+    print(f"{frames} frames ({video:.1f} s of video) in {elapsed:.2f} s, "
+          f"{video / elapsed:.1f}x realtime")
+    if args.output.endswith(".raw"):
+        print(f"encode with: ffmpeg -f rawvideo -pix_fmt {pix_fmt} "
+              f"-s {SCREEN_WIDTH}x{SCREEN_HEIGHT} -r {args.fps} -i {args.output} clip.mp4")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import json
+import sys
+from time import perf_counter, perf_counter_ns
+
+# Optional per-phase frame timing for the main loop. The loop calls
+# begin_frame(), then mark(phase) as each phase finishes and end_frame()
+# at the end. Frames land in a fixed-size ring buffer, so memory stays
+# flat however long the game runs. When profiling is off, main() holds
+# None instead of a profiler, and each call site costs one truth test.
+
+PHASES = ("wait", "events", "logic", "sound", "draw", "display")
+
+class FrameProfiler:
+    def __init__(self, capacity=1200):
+        self.capacity = capacity
+        # Each slot holds (frame start ns, ((phase, end ns), ...), net allocated blocks)
+        self.frames = [None] * capacity
+        self.count = 0
+        self.marks = []
+        self.frame_start = 0
+        self.blocks_start = 0
+        # False until begin_frame(), so a profiler created mid-frame (F3)
+        # does not record that partial frame
+        self.in_frame = False
+
+    def begin_frame(self):
+        self.blocks_start = sys.getallocatedblocks()
+        self.frame_start = perf_counter_ns()
+        self.marks = []
+        self.in_frame = True
+
+    def mark(self, phase):
+        if self.in_frame:
+            self.marks.append((phase, perf_counter_ns()))
+
+    def end_frame(self):
+        if not self.in_frame:
+            return
+        self.in_frame = False
+        blocks = sys.getallocatedblocks() - self.blocks_start
+        self.frames[self.count % self.capacity] = (self.frame_start, tuple(self.marks), blocks)
+        self.count += 1
+
+    def recent(self):
+        # Recorded frames, oldest first
+        if self.count <= self.capacity:
+            return self.frames[:self.count]
+        start = self.count % self.capacity
+        return self.frames[start:] + self.frames[:start]
+
+    def summary(self):
+        # Frame-time percentiles, mean time per phase and mean net block growth
+        # (blocks allocated minus blocks freed), all over the frames in the
+        # buffer. Times are in milliseconds.
+        frames = self.recent()
+        if not frames:
+            return None
+
+        # Busy time excludes the scheduler's wait so idle frames do not dominate
+        frame_times = []
+        phase_totals = dict.fromkeys(PHASES, 0)
+        for start, marks, _ in frames:
+            busy = 0
+            previous = start
+            for phase, end in marks:
+                phase_totals[phase] = phase_totals.get(phase, 0) + end - previous
+                if phase != "wait":
+                    busy += end - previous
+                previous = end
+            frame_times.append(busy)
+
+        frame_times.sort()
+        n = len(frames)
+        return {
+            "frames": n,
+            "p50_ms": frame_times[n // 2] / 1e6,
+            "p99_ms": frame_times[min(n - 1, n * 99 // 100)] / 1e6,
+            "max_ms": frame_times[-1] / 1e6,
+            "phase_ms": {phase: total / n / 1e6 for phase, total in phase_totals.items()},
+            "net_blocks": sum(frame[2] for frame in frames) / n,
+        }
+
+    def chrome_trace(self):
+        # Trace Event Format, viewable in chrome://tracing or Perfetto
+        events = []
+        for index, (start, marks, blocks) in enumerate(self.recent()):
+            previous = start
+            for phase, end in marks:
+                events.append({"name": phase, "ph": "X", "pid": 1, "tid": 1,
+                               "ts": previous / 1000, "dur": (end - previous) / 1000})
+                previous = end
+            events.append({"name": "net_blocks", "ph": "C", "pid": 1, "tid": 1,
+                           "ts": start / 1000, "args": {"blocks": blocks}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+# Time-to-first-frame breakdown. mark(phase) closes a phase that ran on
+# the startup path; `background` records work done on another thread
+# whose wait was folded into that phase.
+class StartupProfiler:
+    def __init__(self, started):
+        self.started = started
+        self.last = started
+        self.phases = []
+        self.first_frame = None
+
+    def mark(self, phase, background=None):
+        now = perf_counter()
+        self.phases.append((phase, now - self.last, background))
+        self.last = now
+        if phase == "first frame":
+            self.first_frame = now - self.started
+
+    def report(self):
+        lines = ["startup:"]
+        for phase, seconds, background in self.phases:
+            line = f"  {phase:12s} {seconds * 1000:8.1f} ms"
+            if background is not None:
+                line += f"  ({background * 1000:.1f} ms on a background thread)"
+            lines.append(line)
+        if self.first_frame is not None:
+            lines.append(f"  time to first frame {self.first_frame * 1000:.1f} ms")
+        lines.append(f"  ready to play       {(self.last - self.started) * 1000:.1f} ms")
+        return lines
+
+def overlay_lines(summary, input_latency=None, audio=None):
+    if summary is None:
+        return ["no frames yet"]
+    lines = [
+        f"frame p50 {summary['p50_ms']:.2f} ms",
+        f"frame p99 {summary['p99_ms']:.2f} ms",
+    ]
+    for phase in PHASES[1:]:
+        lines.append(f"{phase:8s} {summary['phase_ms'].get(phase, 0):.3f} ms")
+    lines.append(f"net blocks {summary['net_blocks']:+.1f}")
+    if input_latency:
+        lines.append(f"input {input_latency[0]:.1f}/{input_latency[1]:.1f} ms")
+    if audio:
+        play = audio["play_ms"]
+        lines.append(f"audio {audio['buffer_ms']:.1f}+{play[1] if play else 0:.1f} ms")
+        lines.append(f"late {audio['late']} steal {audio['stolen']} drop {audio['dropped']}")
+    return lines
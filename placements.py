@@ -0,0 +1,227 @@
+from collections import deque, namedtuple
+from functools import reduce
+from operator import or_
+
+from engine import (
+    GRID_WIDTH, GRID_HEIGHT, ORIENTATIONS, KICKS,
+    LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP,
+    Tetromino, lock_tetromino,
+)
+from bitboard import SHIFTED_MASKS, row_masks
+
+# Legal-placement enumeration for bots and analysis. The search runs on
+# walled row bitmasks and a precomputed piece graph instead of driving a
+# Tetromino, so it plays no sounds and never touches game state.
+#
+# Above the stack nothing can block a falling piece, so the search only
+# walks rotations and sideways moves on the starting row and drops each
+# of those with the skyline index. Moves from a falling piece are tried
+# only on the rows where they would end up below some column's top, which
+# is where tucks and spins under overhangs happen, and only those states
+# get a full breadth-first search over (rotation, x, y).
+
+# One in-bounds (rotation, x) of a shape. masks are its SHIFTED_MASKS and
+# columns their union, bottom holds (column, dy) of the lowest cell in
+# each column, moves the (action, x) sideways neighbours and kicks the
+# (rotation, x, dy) rotation targets in the order they are tried.
+Node = namedtuple("Node", "masks columns bottom moves kicks")
+
+def build_graph(shape_idx):
+    orientations = ORIENTATIONS[shape_idx]
+    graph = []
+    for rotation, orientation in enumerate(orientations):
+        after = (rotation + 1) % 4
+        last_x = GRID_WIDTH - orientation.width
+        nodes = [None] * GRID_WIDTH
+        for x in range(last_x + 1):
+            moves = tuple((action, x + dx) for action, dx in ((LEFT, -1), (RIGHT, 1))
+                          if 0 <= x + dx <= last_x)
+            # Kicks into the walls can never fit, so they are left out
+            kicks = tuple((after, x + dx, dy) for dx, dy in KICKS[shape_idx][rotation]
+                          if 0 <= x + dx <= GRID_WIDTH - orientations[after].width)
+            masks = SHIFTED_MASKS[shape_idx][rotation][x]
+            nodes[x] = Node(masks, reduce(or_, masks),
+                            tuple((x + dx, dy) for dx, dy in orientation.bottom),
+                            moves, kicks)
+        graph.append(tuple(nodes))
+    return tuple(graph)
+
+# Board-independent moves of every shape, computed once at import
+GRAPH = tuple(build_graph(shape_idx) for shape_idx in range(len(ORIENTATIONS)))
+
+class Placement:
+    # One final resting position with the actions that reach it (ending in
+    # HARD_DROP). The board after locking the piece and clearing lines is
+    # only built when board or lines_cleared is first read, so the source
+    # board must not change before then.
+    __slots__ = ("shape_idx", "rotation", "x", "y", "path", "source", "result")
+
+    def __init__(self, source, shape_idx, rotation, x, y, path):
+        self.source = source
+        self.shape_idx = shape_idx
+        self.rotation = rotation
+        self.x = x
+        self.y = y
+        self.path = path
+        self.result = None
+
+    def lock(self):
+        if self.result is None:
+            piece = Tetromino(self.shape_idx)
+            piece.rotation, piece.x, piece.y = self.rotation, self.x, self.y
+            board = self.source.copy()
+            self.result = board, lock_tetromino(board, piece)
+        return self.result
+
+    @property
+    def board(self):
+        return self.lock()[0]
+
+    @property
+    def lines_cleared(self):
+        return self.lock()[1]
+
+def enumerate_placements(board, tetromino):
+    # Every distinct final resting placement reachable from the tetromino's
+    # current position
+    shape_idx = tetromino.shape_idx
+    return [Placement(board, shape_idx, rotation, x, y, path)
+            for rotation, x, y, path in find_placements(board, shape_idx, tetromino.rotation,
+                                                         tetromino.x, tetromino.y)]
+
+def find_placements(board, shape_idx, rotation, x, y):
+    # Returns a tuple of (rotation, x, y, path) per distinct set of final
+    # cells: straight drops from the starting row first, then placements
+    # that need moves under the stack
+    graph = GRAPH[shape_idx]
+    rows = row_masks(board)
+    tops = [GRID_HEIGHT - height for height in board.heights]
+
+    # Lowest y at which each (rotation, x) is still above every column top
+    clear_until = [[node and min(tops[column] - 1 - dy for column, dy in node.bottom)
+                    for node in nodes] for nodes in graph]
+
+    # Columns with an empty cell under their top. Lower than clear_until a
+    # piece only fits if it covers one of them.
+    hollow = 0
+    above = 0
+    for row in rows:
+        hollow |= above & ~row
+        above |= row
+
+    def fits(rotation, x, y):
+        if y <= clear_until[rotation][x]:
+            return True
+        node = graph[rotation][x]
+        if not node.columns & hollow:
+            return False
+        for mask in node.masks:
+            if y >= GRID_HEIGHT:
+                return False
+            if y >= 0 and rows[y] & mask:
+                return False
+            y += 1
+        return True
+
+    if not 0 <= x < GRID_WIDTH or graph[rotation][x] is None or not fits(rotation, x, y):
+        return ()
+
+    # Rotations and sideways moves on the starting row, with their paths
+    top = y
+    columns = [(rotation, x)]
+    routes = {(rotation, x): ()}
+    overhang = deque()
+    paths = {}
+    for rotation, x in columns:
+        node = graph[rotation][x]
+        path = routes[rotation, x]
+        for action, nx in node.moves:
+            if (rotation, nx) not in routes and fits(rotation, nx, top):
+                routes[rotation, nx] = path + (action,)
+                columns.append((rotation, nx))
+        for kick_rotation, kx, dy in node.kicks:
+            if fits(kick_rotation, kx, top + dy):
+                if dy:
+                    state = (kick_rotation, kx, top + dy)
+                    if state not in paths:
+                        paths[state] = path + (ROTATE,)
+                        overhang.append(state)
+                elif (kick_rotation, kx) not in routes:
+                    routes[kick_rotation, kx] = path + (ROTATE,)
+                    columns.append((kick_rotation, kx))
+                break
+
+    # Drop each of them: a lookup above the stack, stepping down otherwise
+    landing = {}
+    for rotation, x in columns:
+        land = clear_until[rotation][x]
+        if land < top:
+            land = top
+            while fits(rotation, x, land + 1):
+                land += 1
+        landing[rotation, x] = land
+
+    def visit(state, path):
+        rotation, x, y = state
+        land = landing.get((rotation, x))
+        # Skip states already reached, including those on a straight drop
+        if state not in paths and (land is None or not top <= y <= land):
+            paths[state] = path
+            overhang.append(state)
+
+    # Moves from a falling piece only lead somewhere new where the target
+    # is not clear of the stack: a clear target is clear on the starting
+    # row too, and the same move made there already dropped through it
+    for rotation, x in columns:
+        node = graph[rotation][x]
+        land = landing[rotation, x]
+        route = routes[rotation, x]
+        for action, nx in node.moves:
+            if not graph[rotation][nx].columns & hollow:
+                continue
+            for y in range(max(top, clear_until[rotation][nx] + 1), land + 1):
+                if fits(rotation, nx, y):
+                    visit((rotation, nx, y), route + (SOFT_DROP,) * (y - top) + (action,))
+        if not node.kicks:
+            continue
+        first_rotation, first_x, first_dy = node.kicks[0]
+        start = top if first_dy else max(top, clear_until[first_rotation][first_x] + 1)
+        for y in range(start, land + 1):
+            for kick_rotation, kx, dy in node.kicks:
+                if fits(kick_rotation, kx, y + dy):
+                    visit((kick_rotation, kx, y + dy),
+                          route + (SOFT_DROP,) * (y - top) + (ROTATE,))
+                    break
+
+    # Everything else is under an overhang: full search from there
+    resting = []
+    while overhang:
+        state = overhang.popleft()
+        rotation, x, y = state
+        node = graph[rotation][x]
+        path = paths[state]
+        for action, nx in node.moves:
+            if fits(rotation, nx, y):
+                visit((rotation, nx, y), path + (action,))
+        for kick_rotation, kx, dy in node.kicks:
+            if fits(kick_rotation, kx, y + dy):
+                visit((kick_rotation, kx, y + dy), path + (ROTATE,))
+                break
+        if fits(rotation, x, y + 1):
+            visit((rotation, x, y + 1), path + (SOFT_DROP,))
+        else:
+            resting.append((rotation, x, y, path + (HARD_DROP,)))
+
+    # Keep the first placement found for each set of cells; straight drops
+    # hard drop from the starting row
+    placements = []
+    seen_cells = set()
+    finals = [(rotation, x, landing[rotation, x], routes[rotation, x] + (HARD_DROP,))
+              for rotation, x in columns]
+    for placement in finals + resting:
+        rotation, x, y, _ = placement
+        cells = (y, graph[rotation][x].masks)
+        if cells not in seen_cells:
+            seen_cells.add(cells)
+            placements.append(placement)
+    return tuple(placements)
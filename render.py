@@ -0,0 +1,202 @@
+import pygame
+
+from engine import GRID_WIDTH, GRID_HEIGHT, RED, COLORS
+
+# Screen layout
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+GRID_SIZE = 30
+GRID_OFFSET_X = (SCREEN_WIDTH - GRID_WIDTH * GRID_SIZE) // 2
+GRID_OFFSET_Y = (SCREEN_HEIGHT - GRID_HEIGHT * GRID_SIZE) // 2
+
+PREVIEW_X = GRID_OFFSET_X + GRID_WIDTH * GRID_SIZE + 50
+PREVIEW_Y = GRID_OFFSET_Y + 50
+PREVIEW_SIZE = 4 * GRID_SIZE
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GRAY = (128, 128, 128)
+
+INSTRUCTIONS = [
+    "Controls:",
+    "← → : Move",
+    "↑ : Rotate",
+    "↓ : Soft Drop",
+    "Space : Hard Drop",
+    "P : Pause"
+]
+
+# Score, level and lines rows: (label, state attribute, y)
+HUD_LINES = [
+    ("Score", "score", 50),
+    ("Level", "level", 100),
+    ("Lines", "lines_cleared", 150),
+]
+
+PLAYFIELD_RECT = pygame.Rect(GRID_OFFSET_X, GRID_OFFSET_Y,
+                             GRID_WIDTH * GRID_SIZE, GRID_HEIGHT * GRID_SIZE)
+PREVIEW_RECT = pygame.Rect(PREVIEW_X, PREVIEW_Y, PREVIEW_SIZE, PREVIEW_SIZE)
+DEBUG_OVERLAY_RECT = pygame.Rect(SCREEN_WIDTH - 190, SCREEN_HEIGHT - 240, 180, 230)
+
+# Renders the game onto a surface. Fonts, text, the static background
+# (border, preview box and instructions) and one outlined tile per piece
+# color are built once; draw() only repaints the regions whose inputs
+# changed and returns their rects for pygame.display.update(). Settled
+# cells are kept on a board layer that is rebuilt only when a piece
+# locks, so a moving piece costs one batched blits() call.
+class Renderer:
+    def __init__(self, surface):
+        self.surface = surface
+        self.font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 24)
+        self.big_font = pygame.font.Font(None, 72)
+        self.hud_width = GRID_OFFSET_X - 60
+        self.hud_height = self.font.get_linesize()
+        self.background = self.render_background()
+        self.tiles = {color: self.render_tile(color) for color in COLORS}
+        self.board_layer = self.background.subsurface(PLAYFIELD_RECT).copy()
+        self.board_layer_version = None
+        self.text_cache = {}
+        self.invalidate()
+
+    def render_background(self):
+        background = pygame.Surface(self.surface.get_size())
+        background.fill(BLACK)
+
+        # Draw grid border
+        pygame.draw.rect(background, WHITE,
+                        (GRID_OFFSET_X - 2, GRID_OFFSET_Y - 2,
+                         GRID_WIDTH * GRID_SIZE + 4, GRID_HEIGHT * GRID_SIZE + 4), 2)
+
+        # Draw preview box and "NEXT" text
+        pygame.draw.rect(background, WHITE, (PREVIEW_X, PREVIEW_Y, PREVIEW_SIZE, PREVIEW_SIZE), 2)
+        background.blit(self.font.render("NEXT", True, WHITE), (PREVIEW_X, PREVIEW_Y - 40))
+
+        # Draw game instructions
+        y_pos = 250
+        for instruction in INSTRUCTIONS:
+            background.blit(self.small_font.render(instruction, True, WHITE), (50, y_pos))
+            y_pos += 30
+
+        return background.convert() if pygame.display.get_surface() else background
+
+    def render_tile(self, color):
+        tile = pygame.Surface((GRID_SIZE, GRID_SIZE))
+        tile.fill(color)
+        pygame.draw.rect(tile, WHITE, tile.get_rect(), 1)
+        return tile.convert() if pygame.display.get_surface() else tile
+
+    def invalidate(self):
+        # Force a full repaint, e.g. after an overlay was drawn on top
+        self.full_redraw = True
+        self.playfield_key = None
+        self.preview_key = None
+        self.hud_keys = [None] * len(HUD_LINES)
+
+    def render_text(self, text, font=None, color=WHITE):
+        key = (text, font, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) > 256:
+                self.text_cache.clear()
+            surface = (font or self.font).render(text, True, color)
+            self.text_cache[key] = surface
+        return surface
+
+    def draw(self, state):
+        dirty = []
+        if self.full_redraw:
+            self.surface.blit(self.background, (0, 0))
+            dirty.append(self.surface.get_rect())
+            self.full_redraw = False
+
+        piece = state.current_tetromino
+        key = (state.board_version, piece.shape_idx, piece.rotation, piece.x, piece.y)
+        if key != self.playfield_key:
+            self.playfield_key = key
+            self.draw_playfield(state)
+            dirty.append(PLAYFIELD_RECT)
+
+        key = state.next_tetromino.shape_idx
+        if key != self.preview_key:
+            self.preview_key = key
+            self.draw_preview(state.next_tetromino)
+            dirty.append(PREVIEW_RECT)
+
+        for i, (label, attr, y) in enumerate(HUD_LINES):
+            value = getattr(state, attr)
+            if value != self.hud_keys[i]:
+                self.hud_keys[i] = value
+                rect = pygame.Rect(50, y, self.hud_width, self.hud_height)
+                self.surface.blit(self.background, rect, rect)
+                self.surface.blit(self.render_text(f"{label}: {value}"), rect)
+                dirty.append(rect)
+
+        return dirty
+
+    def draw_playfield(self, state):
+        if state.board_version != self.board_layer_version:
+            self.board_layer_version = state.board_version
+            self.render_board_layer(state.board)
+
+        # Board layer plus the current tetromino in one batch
+        piece = state.current_tetromino
+        tile = self.tiles[piece.color]
+        left = GRID_OFFSET_X + piece.x * GRID_SIZE
+        top = GRID_OFFSET_Y + piece.y * GRID_SIZE
+        self.surface.blits([(self.board_layer, PLAYFIELD_RECT)] + [
+            (tile, (left + x * GRID_SIZE, top + y * GRID_SIZE)) for x, y in piece.cells
+        ], False)
+
+    def render_board_layer(self, board):
+        # Playfield background with the settled cells, in playfield coordinates
+        self.board_layer.blit(self.background, (0, 0), PLAYFIELD_RECT)
+        tiles = self.tiles
+        self.board_layer.blits([
+            (tiles[color], (x * GRID_SIZE, y * GRID_SIZE))
+            for y, row in enumerate(board)
+            for x, color in enumerate(row) if color
+        ], False)
+
+    def draw_preview(self, next_tetromino):
+        # Calculate offset to center the tetromino in the preview box
+        orientation = next_tetromino.orientation
+        offset_x = PREVIEW_X + (PREVIEW_SIZE - orientation.width * GRID_SIZE) // 2
+        offset_y = PREVIEW_Y + (PREVIEW_SIZE - orientation.height * GRID_SIZE) // 2
+
+        tile = self.tiles[next_tetromino.color]
+        self.surface.blits([(self.background, PREVIEW_RECT, PREVIEW_RECT)] + [
+            (tile, (offset_x + x * GRID_SIZE, offset_y + y * GRID_SIZE))
+            for x, y in orientation.cells
+        ], False)
+
+    def draw_game_over(self):
+        text = self.render_text("GAME OVER", self.big_font, RED)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
+
+        restart_text = self.render_text("Press SPACE to restart")
+        restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
+
+        self.surface.blit(text, text_rect)
+        self.surface.blit(restart_text, restart_rect)
+        self.invalidate()
+
+    def draw_pause(self):
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 128))
+        self.surface.blit(overlay, (0, 0))
+
+        text = self.render_text("PAUSED", self.big_font)
+        text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        self.surface.blit(text, text_rect)
+        self.invalidate()
+
+    def draw_debug_overlay(self, lines):
+        # Redraw the debug text box; an empty list just clears it
+        self.surface.blit(self.background, DEBUG_OVERLAY_RECT, DEBUG_OVERLAY_RECT)
+        y = DEBUG_OVERLAY_RECT.y
+        for line in lines:
+            self.surface.blit(self.small_font.render(line, True, GRAY), (DEBUG_OVERLAY_RECT.x, y))
+            y += 20
+        return DEBUG_OVERLAY_RECT
@@ -0,0 +1,120 @@
+import argparse
+import struct
+import sys
+
+from engine import GameState
+from bitboard import create_bitboard
+
+# Replay format: a fixed header followed by the input stream. Every input
+# is one varint holding (tick delta << 3) | action, so a typical game
+# costs one or two bytes per step.
+#
+#   magic "TRPL", version, seed, final score, lines, level, input count
+MAGIC = b"TRPL"
+VERSION = 1
+HEADER = struct.Struct("<4sBQQIII")
+ACTION_BITS = 3
+# The header stores the seed unsigned in 64 bits
+MAX_SEED = 2 ** 64 - 1
+
+# Ticks are logic frames of the game loop
+TICKS_PER_SECOND = 60
+
+class ReplayError(Exception):
+    pass
+
+class ReplayRecorder:
+    def __init__(self, seed):
+        self.seed = seed
+        self.inputs = []
+
+    def record(self, tick, action):
+        self.inputs.append((tick, action))
+
+    def to_bytes(self, state):
+        body = bytearray()
+        last_tick = 0
+        for tick, action in self.inputs:
+            value = ((tick - last_tick) << ACTION_BITS) | action
+            last_tick = tick
+            while value >= 0x80:
+                body.append((value & 0x7F) | 0x80)
+                value >>= 7
+            body.append(value)
+        header = HEADER.pack(MAGIC, VERSION, self.seed, state.score,
+                             state.lines_cleared, state.level, len(self.inputs))
+        return header + bytes(body)
+
+    def save(self, path, state):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes(state))
+
+def parse_replay(data):
+    # Returns (seed, (score, lines, level), inputs) with absolute tick stamps
+    if len(data) < HEADER.size:
+        raise ReplayError("truncated header")
+    magic, version, seed, score, lines, level, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ReplayError("not a replay file")
+    if version != VERSION:
+        raise ReplayError(f"unsupported replay version {version}")
+
+    inputs = []
+    tick = 0
+    value = shift = 0
+    action_mask = (1 << ACTION_BITS) - 1
+    for byte in data[HEADER.size:]:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        tick += value >> ACTION_BITS
+        inputs.append((tick, value & action_mask))
+        value = shift = 0
+    if shift or len(inputs) != count:
+        raise ReplayError("truncated input stream")
+
+    return seed, (score, lines, level), inputs
+
+def play_replay(data):
+    # Re-simulate a replay as fast as possible and return the final state
+    seed, _, inputs = parse_replay(data)
+    state = GameState(seed, create_bitboard)
+    step = state.step
+    for _, action in inputs:
+        step(action)
+    return state
+
+def verify_replay(data):
+    # True when re-simulation reproduces the recorded score, lines and level
+    _, expected, _ = parse_replay(data)
+    state = play_replay(data)
+    return (state.score, state.lines_cleared, state.level) == expected
+
+def verify_file(path):
+    try:
+        with open(path, "rb") as f:
+            return path, verify_replay(f.read()), None
+    except (OSError, ReplayError) as e:
+        return path, False, str(e)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-verify Tetris replays")
+    parser.add_argument("replays", nargs="+", help="replay files")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    from multiprocessing import Pool
+
+    failures = 0
+    with Pool(args.jobs) as pool:
+        for path, ok, error in pool.imap_unordered(verify_file, args.replays, chunksize=16):
+            if not ok:
+                failures += 1
+                print(f"{path}: {error or 'MISMATCH'}")
+    print(f"{len(args.replays) - failures}/{len(args.replays)} replays verified")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
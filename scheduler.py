@@ -0,0 +1,48 @@
+import math
+import time
+
+import pygame
+
+DEFAULT_FPS = 60
+POWER_SAVE_FPS = 30
+
+# Decides when the main loop wakes up. Instead of spinning at a fixed
+# frame rate, the loop blocks in pygame.event.wait() until input arrives
+# or the next deadline (a logic tick, a key repeat or a frame slot) is
+# due. Input is never held back; the frame cap only limits how often a
+# frame is presented. While idle (paused, game over) it blocks with no
+# timeout at all. Times come from time.perf_counter().
+class FrameScheduler:
+    def __init__(self, fps=DEFAULT_FPS, power_save=False):
+        if power_save:
+            fps = min(fps, POWER_SAVE_FPS)
+        self.fps = fps
+        self.frame_time = 1.0 / fps if fps > 0 else 0.0
+        self.power_save = power_save
+        self.last_frame = 0.0
+
+    def wait(self, deadline):
+        # Block until an event arrives or perf_counter() reaches deadline.
+        # Returns the pending events, possibly none.
+        events = pygame.event.get()
+        if not events:
+            # Round up so the loop never wakes just short of the deadline
+            timeout = math.ceil((deadline - time.perf_counter()) * 1000)
+            if timeout > 0:
+                event = pygame.event.wait(timeout)
+                if event.type != pygame.NOEVENT:
+                    events = [event] + pygame.event.get()
+        return events
+
+    def idle(self):
+        # Block until something happens, with no timeout
+        return [pygame.event.wait()] + pygame.event.get()
+
+    def next_frame(self):
+        return self.last_frame + self.frame_time
+
+    def frame_ready(self, now):
+        return now >= self.last_frame + self.frame_time
+
+    def frame_presented(self, now):
+        self.last_frame = now
@@ -0,0 +1,287 @@
+import argparse
+import asyncio
+import json
+import random
+import socket
+import threading
+
+from engine import (
+    GRID_WIDTH, GRID_HEIGHT, COLOR_INDEX, LEFT, RIGHT, ROTATE, SOFT_DROP, GRAVITY, GameState,
+)
+from bitboard import BitBoard
+
+# Spectator server: streams live games to any number of viewers over TCP
+# as newline-delimited JSON. A viewer connects, sends the game id on one
+# line (an empty line picks "default"), and receives a keyframe followed
+# by one delta per published tick:
+#
+#   {"type": "key", "seq": n, "cells": "<H*W digits>", "piece": [...], ...}
+#   {"type": "delta", "seq": n, "cells": [index, color, ...], "score": ...}
+#
+# Cells are shape_idx + 1 (0 for empty), indexed y * GRID_WIDTH + x.
+# Each delta is encoded once and shared by every subscriber. A subscriber
+# whose queue fills up loses its queued deltas and is resynced with a
+# keyframe, so slow viewers never hold up the game.
+
+DEFAULT_PORT = 7878
+DEFAULT_QUEUE_SIZE = 64
+SEND_BUFFER_SIZE = 16384
+
+def encode_board(board):
+    if isinstance(board, BitBoard):
+        return bytes(board.colors)
+    return bytes(COLOR_INDEX[cell] if cell else 0 for row in board for cell in row)
+
+def state_fields(state):
+    piece = state.current_tetromino
+    return {
+        "piece": [piece.shape_idx, piece.rotation, piece.x, piece.y],
+        "next": state.next_tetromino.shape_idx,
+        "score": state.score,
+        "level": state.level,
+        "lines": state.lines_cleared,
+        "over": state.game_over,
+    }
+
+# Runs on the game's side: turns successive states into deltas. The board
+# is only diffed when its board_version changed.
+class StateEncoder:
+    def __init__(self):
+        self.cells = bytes(GRID_WIDTH * GRID_HEIGHT)
+        self.board_version = None
+        self.fields = {}
+
+    def delta(self, state):
+        delta = {}
+        if state.board_version != self.board_version:
+            self.board_version = state.board_version
+            cells = encode_board(state.board)
+            changes = []
+            for i, (old, new) in enumerate(zip(self.cells, cells)):
+                if old != new:
+                    changes += (i, new)
+            if changes:
+                delta["cells"] = changes
+            self.cells = cells
+
+        for key, value in state_fields(state).items():
+            if self.fields.get(key) != value:
+                self.fields[key] = delta[key] = value
+        return delta
+
+class Subscriber:
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.resyncs = 0
+
+# Server-side view of one game, rebuilt from its deltas so keyframes can
+# be produced at any time without asking the game
+class Channel:
+    def __init__(self):
+        self.cells = bytearray(GRID_WIDTH * GRID_HEIGHT)
+        self.fields = {}
+        self.seq = 0
+        self.subscribers = set()
+
+    def apply(self, delta):
+        self.seq += 1
+        changes = delta.get("cells", ())
+        for i in range(0, len(changes), 2):
+            self.cells[changes[i]] = changes[i + 1]
+        for key, value in delta.items():
+            if key != "cells":
+                self.fields[key] = value
+
+    def keyframe(self):
+        message = {"type": "key", "seq": self.seq,
+                   "cells": "".join(map(str, self.cells)), **self.fields}
+        return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+class SpectatorServer:
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, queue_size=DEFAULT_QUEUE_SIZE):
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.channels = {}
+        self.encoders = {}
+        self.loop = None
+        self.server = None
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        # Pick up the real port when asked for an ephemeral one
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def start_in_thread(self):
+        # Run the server on its own event loop so a synchronous game loop can publish to it
+        started = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(self.start())
+            started.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, name="spectator-server", daemon=True).start()
+        started.wait()
+
+    def stop(self):
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.server.close)
+
+    def channel(self, game_id):
+        if game_id not in self.channels:
+            self.channels[game_id] = Channel()
+        return self.channels[game_id]
+
+    def publish(self, state, game_id="default"):
+        # Safe to call from the game's thread: the delta is computed here and
+        # handed to the event loop without waiting for it
+        encoder = self.encoders.get(game_id)
+        if encoder is None:
+            encoder = self.encoders[game_id] = StateEncoder()
+        delta = encoder.delta(state)
+        if not delta:
+            return
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self.loop:
+            self.broadcast(game_id, delta)
+        else:
+            self.loop.call_soon_threadsafe(self.broadcast, game_id, delta)
+
+    def broadcast(self, game_id, delta):
+        channel = self.channel(game_id)
+        channel.apply(delta)
+        if not channel.subscribers:
+            return
+
+        data = (json.dumps({"type": "delta", "seq": channel.seq, **delta},
+                           separators=(",", ":")) + "\n").encode()
+        keyframe = None
+        for subscriber in channel.subscribers:
+            queue = subscriber.queue
+            try:
+                queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # Too far behind: drop what is queued and resync with a keyframe
+                while not queue.empty():
+                    queue.get_nowait()
+                if keyframe is None:
+                    keyframe = channel.keyframe()
+                queue.put_nowait(keyframe)
+                subscriber.resyncs += 1
+
+    async def handle_client(self, reader, writer):
+        try:
+            game_id = (await reader.readline()).decode().strip() or "default"
+        except (ConnectionError, UnicodeDecodeError):
+            writer.close()
+            return
+
+        # Keep the kernel's send buffer small so backlog builds up in the
+        # queue, where it can be dropped, rather than in the socket
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE)
+        writer.transport.set_write_buffer_limits(SEND_BUFFER_SIZE)
+
+        channel = self.channel(game_id)
+        subscriber = Subscriber(writer, self.queue_size)
+        subscriber.queue.put_nowait(channel.keyframe())
+        channel.subscribers.add(subscriber)
+        try:
+            while True:
+                writer.write(await subscriber.queue.get())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            channel.subscribers.discard(subscriber)
+            writer.close()
+
+# Viewer side: rebuilds a game from the stream
+class SpectatorClient:
+    def __init__(self):
+        self.cells = bytearray(GRID_WIDTH * GRID_HEIGHT)
+        self.fields = {}
+        self.seq = None
+
+    def apply(self, message):
+        if message["type"] == "key":
+            self.cells = bytearray(int(c) for c in message["cells"])
+        elif self.seq is None or message["seq"] != self.seq + 1:
+            # Missed deltas: wait for the keyframe the server will send
+            self.seq = None
+            return False
+        else:
+            changes = message.get("cells", ())
+            for i in range(0, len(changes), 2):
+                self.cells[changes[i]] = changes[i + 1]
+        self.seq = message["seq"]
+        for key, value in message.items():
+            if key not in ("type", "seq", "cells"):
+                self.fields[key] = value
+        return True
+
+    def board(self):
+        # Rows of cell values (shape_idx + 1, 0 for empty)
+        return [list(self.cells[y * GRID_WIDTH:(y + 1) * GRID_WIDTH]) for y in range(GRID_HEIGHT)]
+
+    async def watch(self, host="127.0.0.1", port=DEFAULT_PORT, game_id="default"):
+        # Yield after every message applied
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(game_id.encode() + b"\n")
+        await writer.drain()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                if self.apply(json.loads(line)):
+                    yield self
+        finally:
+            writer.close()
+
+async def run_demo_games(server, games, ticks_per_second):
+    # Headless random play so viewers have something to watch
+    # The first game is "default", the rest "game1", "game2", ...
+    rng = random.Random()
+    states = {("default" if i == 0 else f"game{i}"): GameState(rng.randrange(2 ** 32))
+              for i in range(games)}
+    while True:
+        for game_id, state in states.items():
+            state.step(rng.choice((LEFT, RIGHT, ROTATE, SOFT_DROP, GRAVITY, GRAVITY)))
+            if state.game_over:
+                state.reset(rng.randrange(2 ** 32))
+            server.publish(state, game_id)
+        await asyncio.sleep(1 / ticks_per_second)
+
+async def serve(args):
+    server = SpectatorServer(args.host, args.port, args.queue_size)
+    await server.start()
+    print(f"Spectator server on {args.host}:{server.port} with {args.games} demo game(s)")
+    await run_demo_games(server, args.games, args.tick_rate)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream headless Tetris games to spectators")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--games", type=int, default=1, help="demo games to run")
+    parser.add_argument("--tick-rate", type=int, default=60)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="messages buffered per viewer before it is resynced")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
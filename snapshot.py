@@ -0,0 +1,183 @@
+from collections import OrderedDict
+
+from engine import GRID_WIDTH, GRID_HEIGHT, COLOR_INDEX, Tetromino, fall_speed_for_level
+from bitboard import WALL, EMPTY_ROW, PALETTE, BitBoard
+
+# Immutable game-state snapshots for search, undo and practice modes.
+# The board is a tuple of per-row bytes (shape_idx + 1 per cell, 0 for
+# empty). Rows are shared wherever possible: all empty rows are one
+# object, and snapshot(state, previous) reuses every row of `previous`
+# that did not change, or the whole board if no piece locked since.
+#
+# Equality and hashing cover the position only: board, current piece,
+# next piece, score, level, lines and game over. The generator state and
+# skyline index ride along so restore() is exact and cheap, but two games
+# that reach the same position compare equal, which is what a
+# transposition cache wants.
+
+EMPTY = bytes(GRID_WIDTH)
+
+class Snapshot:
+    __slots__ = ("rows", "piece", "next_piece", "score", "level", "lines_cleared", "game_over",
+                 "index", "rng_state", "board_version", "key", "hash")
+
+    def __init__(self, rows, piece, next_piece, score=0, level=1, lines_cleared=0,
+                 game_over=False, index=None, rng_state=None, board_version=None):
+        # piece is (shape_idx, rotation, x, y); next_piece is a shape_idx
+        key = (rows, piece, next_piece, score, level, lines_cleared, game_over)
+        for name, value in zip(self.__slots__, key + (index, rng_state, board_version, key, hash(key))):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Snapshot is immutable")
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        if not isinstance(other, Snapshot):
+            return NotImplemented
+        return self.hash == other.hash and self.key == other.key
+
+    def __repr__(self):
+        return (f"Snapshot(piece={self.piece}, next_piece={self.next_piece}, score={self.score}, "
+                f"level={self.level}, lines_cleared={self.lines_cleared})")
+
+    def cell(self, x, y):
+        return self.rows[y][x]
+
+def board_rows(board, previous=()):
+    # Rows as bytes, reusing the matching row object from `previous`
+    row_fill = board.row_fill
+    if isinstance(board, BitBoard):
+        colors = board.colors
+        rows = [bytes(colors[y * GRID_WIDTH:(y + 1) * GRID_WIDTH]) if row_fill[y] else EMPTY
+                for y in range(GRID_HEIGHT)]
+    else:
+        rows = [bytes(COLOR_INDEX[c] if c else 0 for c in board[y]) if row_fill[y] else EMPTY
+                for y in range(GRID_HEIGHT)]
+    if previous:
+        rows = [old if old == new else new for old, new in zip(previous, rows)]
+    return tuple(rows)
+
+def snapshot(state, previous=None, with_rng=True):
+    # Capture `state`. Passing an earlier snapshot of the same game lets
+    # unchanged rows be shared with it. Search that never draws new pieces
+    # can skip copying the generator state, the bulk of the cost.
+    board = state.board
+    if previous is not None and previous.board_version == state.board_version:
+        rows = previous.rows
+        index = previous.index
+    else:
+        rows = board_rows(board, previous.rows if previous is not None else ())
+        index = (tuple(board.heights), tuple(board.row_fill), tuple(board.full_rows),
+                 board.filled, board.total_height, board.bumpiness)
+    piece = state.current_tetromino
+    return Snapshot(rows, (piece.shape_idx, piece.rotation, piece.x, piece.y),
+                    state.next_tetromino.shape_idx, state.score, state.level,
+                    state.lines_cleared, state.game_over, index,
+                    state.rng.getstate() if with_rng else None,
+                    state.board_version)
+
+_EMPTY_BOARDS = {}
+
+def make_board(rows, factory):
+    # Copying a cached empty board skips the factory's own setup
+    template = _EMPTY_BOARDS.get(factory)
+    if template is None:
+        template = _EMPTY_BOARDS[factory] = factory()
+    board = template.copy()
+    if isinstance(board, BitBoard):
+        board.colors[:] = b"".join(rows)
+        board.rows = [EMPTY_ROW if row is EMPTY else row_mask(row) for row in rows]
+    else:
+        board[:] = [[0] * GRID_WIDTH if row is EMPTY else [PALETTE[c] for c in row] for row in rows]
+    return board
+
+def row_mask(row):
+    mask = EMPTY_ROW
+    for x, c in enumerate(row):
+        if c:
+            mask |= 1 << (x + WALL)
+    return mask
+
+def piece_from(shape_idx, rotation=0, x=None, y=0):
+    piece = Tetromino(shape_idx)
+    piece.rotation = rotation
+    if x is not None:
+        piece.x = x
+    piece.y = y
+    return piece
+
+def restore(state, snap):
+    # Put `state` back into the position captured by `snap`, keeping the
+    # state's own board backend
+    board = make_board(snap.rows, state.board_factory)
+    if snap.index is None:
+        board.rebuild_index()
+    else:
+        heights, row_fill, full_rows, board.filled, board.total_height, board.bumpiness = snap.index
+        board.heights = list(heights)
+        board.row_fill = list(row_fill)
+        board.full_rows = list(full_rows)
+    state.board = board
+    state.board_version += 1
+    state.current_tetromino = piece_from(*snap.piece)
+    state.next_tetromino = piece_from(snap.next_piece)
+    state.score = snap.score
+    state.level = snap.level
+    state.lines_cleared = snap.lines_cleared
+    state.fall_speed = fall_speed_for_level(snap.level)
+    state.game_over = snap.game_over
+    if snap.rng_state is not None:
+        state.rng.setstate(snap.rng_state)
+    return state
+
+_MISSING = object()
+
+# Bounded LRU map from snapshots to search results, so a position reached
+# along several move orders is evaluated once. Lookups go through the
+# snapshot's cached hash, with full equality guarding against collisions.
+class TranspositionCache:
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, snap):
+        return snap in self.entries
+
+    def get(self, snap, default=None):
+        value = self.entries.get(snap, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(snap)
+        return value
+
+    def put(self, snap, value):
+        entries = self.entries
+        entries[snap] = value
+        entries.move_to_end(snap)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def lookup(self, snap, evaluate):
+        # Cached value for snap, computing it with evaluate(snap) on a miss
+        value = self.get(snap, _MISSING)
+        if value is _MISSING:
+            value = evaluate(snap)
+            self.put(snap, value)
+        return value
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import tempfile
+import wave
+
+import numpy as np
+
+# Every sound effect is described by parameters and synthesized in one
+# vectorized pass. Both tetris.py and create_sounds.py use this bank, so
+# there is a single pipeline and no WAV files have to be read back.
+#
+# Parameters:
+#   wave      - "tone", "sweep", "chord", "steps", "decay", "noise" or "phase_sweep"
+#   freq      - base frequency in Hz
+#   duration  - length in seconds
+#   amplitude - waveform amplitude before volume is applied
+#   volume    - output gain
+#   fade      - fade in/out length in seconds, 0 for none (skipped for sounds shorter
+#               than two fades)
+#   normalize - scale the waveform to full range instead of applying volume
+#   endpoint  - whether the time axis includes the final instant
+SOUND_BANK = {
+    # Tetris
+    "move": {"wave": "tone", "freq": 220, "duration": 0.1, "volume": 0.4},
+    "rotate": {"wave": "sweep", "freq": 330, "sweep": (1.0, 1.5), "duration": 0.15, "volume": 0.4},
+    "drop": {"wave": "sweep", "freq": 440, "sweep": (1.5, 0.8), "amplitude": 0.7,
+             "duration": 0.2, "volume": 0.5},
+    "clear": {"wave": "chord", "freq": 523, "partials": ((1.0, 0.3), (1.5, 0.2), (2.0, 0.1)),
+              "duration": 0.3, "volume": 0.6},
+    "levelup": {"wave": "steps", "freq": 660, "segments": 5, "step": 0.2,
+                "duration": 0.5, "volume": 0.6},
+    "gameover": {"wave": "steps", "freq": 220, "segments": 8, "step": -0.1,
+                 "duration": 1.0, "volume": 0.7},
+
+    # Shooter effects written by create_sounds.py
+    "player_shoot": {"wave": "decay", "freq": 440, "decay": 5, "duration": 0.2,
+                     "normalize": True, "endpoint": True},
+    "explosion": {"wave": "noise", "decay": 3, "seed": 0, "duration": 0.5,
+                  "normalize": True, "endpoint": True},
+    "enemy_shoot": {"wave": "decay", "freq": 220, "decay": 10, "duration": 0.15,
+                    "normalize": True, "endpoint": True},
+    "game_over": {"wave": "phase_sweep", "sweep": (440, 110), "duration": 1.0,
+                  "normalize": True, "endpoint": True},
+    "level_complete": {"wave": "phase_sweep", "sweep": (220, 880), "duration": 0.7,
+                       "normalize": True, "endpoint": True},
+}
+
+DEFAULTS = {"amplitude": 0.5, "volume": 0.5, "fade": 0.1, "normalize": False, "endpoint": False}
+
+SAMPLE_RATE = 44100
+
+# Part of the cache key; bump it whenever synthesize() changes its output
+SYNTH_VERSION = 1
+
+def synthesize(params, sample_rate=SAMPLE_RATE):
+    # Return the effect as mono int16 samples
+    params = dict(DEFAULTS, **params)
+    kind = params["wave"]
+    n = int(sample_rate * params["duration"])
+    t = np.linspace(0, params["duration"], n, params["endpoint"])
+    freq = params.get("freq", 0)
+    amplitude = params["amplitude"]
+
+    if kind == "tone":
+        note = amplitude * np.sin(2 * np.pi * freq * t)
+    elif kind == "sweep":
+        start, end = params["sweep"]
+        freq_sweep = np.linspace(freq * start, freq * end, n)
+        note = amplitude * np.sin(2 * np.pi * freq_sweep * t)
+    elif kind == "chord":
+        ratios, gains = np.array(params["partials"]).T
+        note = gains @ np.sin(2 * np.pi * freq * ratios[:, None] * t)
+    elif kind == "steps":
+        # Equal-length segments, each at freq * (1 + i * step); samples past
+        # the last whole segment stay silent
+        segments = params["segments"]
+        segment = np.arange(n) // max(n // segments, 1)
+        segment_freq = freq * (1 + segment * params["step"])
+        note = np.where(segment < segments, amplitude * np.sin(2 * np.pi * segment_freq * t), 0.0)
+    elif kind == "decay":
+        note = np.sin(2 * np.pi * freq * t) * np.exp(-params["decay"] * t)
+    elif kind == "noise":
+        rng = np.random.default_rng(params["seed"])
+        note = rng.uniform(-1, 1, n) * np.exp(-params["decay"] * t)
+    elif kind == "phase_sweep":
+        start, end = params["sweep"]
+        note = np.sin(2 * np.pi * np.linspace(start, end, n))
+    else:
+        raise ValueError(f"unknown wave type: {kind}")
+
+    if params["normalize"]:
+        return (note / np.max(np.abs(note)) * 32767).astype(np.int16)
+
+    # Apply fade in/out
+    fade_samples = int(params["fade"] * sample_rate)
+    if fade_samples and n > 2 * fade_samples:
+        note[:fade_samples] *= np.linspace(0, 1, fade_samples)
+        note[-fade_samples:] *= np.linspace(1, 0, fade_samples)
+
+    return (note * params["volume"] * 32767).astype(np.int16)
+
+def params_hash(params, sample_rate):
+    # Covers the defaults synthesize() fills in, not just the bank entry
+    key = json.dumps({"params": dict(DEFAULTS, **params), "sample_rate": sample_rate,
+                      "version": SYNTH_VERSION}, sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+def render(name, sample_rate=SAMPLE_RATE, cache_dir=None):
+    # Synthesize a bank entry, optionally through an on-disk cache keyed by
+    # a hash of its parameters, the defaults and SYNTH_VERSION so edited
+    # parameters never hit a stale file
+    params = SOUND_BANK[name]
+    if cache_dir is None:
+        return synthesize(params, sample_rate)
+
+    path = os.path.join(cache_dir, f"{name}-{params_hash(params, sample_rate)}.pcm")
+    if os.path.exists(path):
+        return np.fromfile(path, dtype=np.int16)
+
+    samples = synthesize(params, sample_rate)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write to a temporary file and rename, so an interrupted write never
+    # leaves a truncated file under the final name
+    fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=cache_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(samples.tobytes())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return samples
+
+def load_sounds(names, cache_dir=None):
+    # Build pygame Sounds straight from memory. Assumes the mixer's default
+    # signed 16-bit sample format.
+    import pygame
+
+    sample_rate, _, channels = pygame.mixer.get_init()
+    sounds = {}
+    for name in names:
+        samples = render(name, sample_rate, cache_dir)
+        if channels > 1:
+            samples = np.repeat(samples[:, None], channels, axis=1)
+        sounds[name] = pygame.mixer.Sound(buffer=np.ascontiguousarray(samples).tobytes())
+    return sounds
+
+def write_wav(name, path, sample_rate=SAMPLE_RATE):
+    samples = render(name, sample_rate)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.tobytes())
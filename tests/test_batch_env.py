@@ -0,0 +1,104 @@
+import random
+
+import numpy as np
+
+from engine import (
+    GRID_WIDTH, GRID_HEIGHT, LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP, GRAVITY, GameState,
+)
+from bitboard import WALL, create_bitboard
+from batch_env import SPAWN_X, BatchEnv
+from tournament import greedy_policy
+
+# BatchEnv(1) and a GameState on the bitboard (whose colors are also
+# shape_idx + 1) step in lockstep. One BatchEnv step is the action plus a
+# gravity tick unless it was a hard drop. The env's random pieces are
+# replaced by the GameState's after every step.
+
+def sync_pieces(env, state):
+    env.piece[0] = state.current_tetromino.shape_idx
+    env.next_piece[0] = state.next_tetromino.shape_idx
+    env.rotation[0] = state.current_tetromino.rotation
+    env.x[0] = state.current_tetromino.x
+    env.y[0] = state.current_tetromino.y
+
+def step_state(state, action):
+    state.step(action)
+    if action != HARD_DROP and not state.game_over:
+        state.step(GRAVITY)
+
+def assert_same(env, state):
+    board = np.frombuffer(state.board.colors, dtype=np.int8).reshape(GRID_HEIGHT, GRID_WIDTH)
+    assert np.array_equal(env.boards[0], board)
+    piece = state.current_tetromino
+    assert env.piece[0] == piece.shape_idx and env.rotation[0] == piece.rotation
+    assert env.x[0] == piece.x and env.y[0] == piece.y
+    assert env.next_piece[0] == state.next_tetromino.shape_idx
+    assert env.score[0] == state.score and env.level[0] == state.level
+    assert env.lines_cleared[0] == state.lines_cleared
+
+def fill(env, state, cells):
+    for x, y in cells:
+        env.boards[0, y, x] = 1
+        state.board.rows[y] |= 1 << (x + WALL)
+        state.board.colors[y * GRID_WIDTH + x] = 1
+    state.board.rebuild_index()
+
+def test_multi_line_clear():
+    # A vertical I in the last column clears rows 16, 17 and 19 but not 18
+    env = BatchEnv(1, seed=0)
+    state = GameState(0, create_bitboard)
+    state.current_tetromino.shape_idx = 0
+    state.current_tetromino.x = 0
+    fill(env, state, [(x, y) for y in (16, 17, 19) for x in range(GRID_WIDTH - 1)]
+         + [(x, 18) for x in range(GRID_WIDTH - 2)] + [(0, 15)])
+    sync_pieces(env, state)
+
+    for action in (ROTATE,) + (RIGHT,) * (GRID_WIDTH - 1) + (HARD_DROP,):
+        rewards, dones = env.step([action])
+        step_state(state, action)
+        env.next_piece[0] = state.next_tetromino.shape_idx
+        assert_same(env, state)
+    assert state.lines_cleared == 3
+    assert rewards[0] == 900 and not dones[0]
+    # Row 18 and the cell above it move down past the cleared rows
+    assert list(env.boards[0, 19]) == [1] * (GRID_WIDTH - 2) + [0, 1]
+    assert list(env.boards[0, 18]) == [1] + [0] * (GRID_WIDTH - 1)
+    assert not env.boards[0, :18].any()
+
+def test_lockstep_with_game_state():
+    env = BatchEnv(1, seed=1)
+    state = GameState(1, create_bitboard)
+    sync_pieces(env, state)
+    rng = random.Random(1)
+    games = 0
+    multi_line_clears = 0
+    top_level = 1
+    for _ in range(3000):
+        if games >= 2 and multi_line_clears and top_level > 1:
+            break
+        # Mostly greedy play, which clears lines; random inputs end games
+        if rng.random() < 0.95:
+            actions = greedy_policy(state, rng) or (HARD_DROP,)
+        else:
+            actions = [rng.choice((LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP))
+                       for _ in range(rng.randrange(1, 6))]
+        for action in actions:
+            lines = state.lines_cleared
+            score = state.score
+            rewards, dones = env.step([action])
+            step_state(state, action)
+            assert rewards[0] == state.score - score
+            multi_line_clears += state.lines_cleared - lines > 1
+            top_level = max(top_level, state.level)
+            assert dones[0] == state.game_over
+            if state.game_over:
+                # The env reset itself; restart the GameState and resync
+                assert env.final_score[0] == state.score
+                assert env.score[0] == 0 and env.level[0] == 1 and not env.boards[0].any()
+                games += 1
+                state.reset(rng.randrange(2 ** 32))
+                sync_pieces(env, state)
+                break
+            env.next_piece[0] = state.next_tetromino.shape_idx
+            assert_same(env, state)
+    assert games >= 2 and multi_line_clears > 0 and top_level > 1
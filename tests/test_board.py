@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from engine import (
+    GRID_WIDTH, GRID_HEIGHT, COLORS, LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP, GRAVITY,
+    GameState, Tetromino, create_board, lock_tetromino,
+)
+from bitboard import WALL, BitBoard, create_bitboard
+from tournament import greedy_policy
+
+BACKENDS = {"list": create_board, "bitboard": create_bitboard}
+
+def play(state, rng, pieces):
+    # Mix greedy placements, which clear lines, with random inputs, which
+    # leave holes and overhangs. Yields after every step.
+    for _ in range(pieces):
+        if state.game_over:
+            state.reset(rng.randrange(2 ** 32))
+        if rng.random() < 0.7:
+            actions = greedy_policy(state, rng) or (HARD_DROP,)
+        else:
+            actions = [rng.choice((LEFT, RIGHT, ROTATE, SOFT_DROP, GRAVITY))
+                       for _ in range(rng.randrange(8))] + [HARD_DROP]
+        for action in actions:
+            state.step(action)
+            yield action
+
+def cells(board):
+    return [[board[y][x] for x in range(GRID_WIDTH)] for y in range(GRID_HEIGHT)]
+
+def position(piece):
+    return piece.shape_idx, piece.rotation, piece.x, piece.y
+
+def fill(board, cells):
+    for x, y in cells:
+        if isinstance(board, BitBoard):
+            board.rows[y] |= 1 << (x + WALL)
+            board.colors[y * GRID_WIDTH + x] = 1
+        else:
+            board[y][x] = COLORS[0]
+    board.rebuild_index()
+
+def index_of(board):
+    return (board.heights, board.row_fill, sorted(board.full_rows), board.filled,
+            board.total_height, board.bumpiness)
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_skyline_index_matches_rebuild(backend):
+    state = GameState(1, BACKENDS[backend])
+    rng = random.Random(1)
+    lines = 0
+    for _ in play(state, rng, 400):
+        expected = state.board.copy()
+        expected.rebuild_index()
+        assert index_of(state.board) == index_of(expected)
+        lines = max(lines, state.lines_cleared)
+    assert lines > 0
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_multi_line_clear(backend):
+    # A vertical I in the last column completes rows 17 and 19 but not 18
+    board = BACKENDS[backend]()
+    fill(board, [(x, y) for y in (17, 19) for x in range(GRID_WIDTH - 1)]
+         + [(x, 18) for x in range(GRID_WIDTH - 2)] + [(0, 16)])
+    piece = Tetromino(0)
+    piece.rotation, piece.x, piece.y = 1, GRID_WIDTH - 1, 16
+
+    assert lock_tetromino(board, piece) == 2
+    occupied = {(x, y) for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH) if board[y][x]}
+    assert occupied == ({(x, 19) for x in range(GRID_WIDTH - 2)} | {(9, 19)}
+                        | {(0, 18), (9, 18)})
+    expected = board.copy()
+    expected.rebuild_index()
+    assert index_of(board) == index_of(expected)
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_drop_distance_matches_scan(backend):
+    state = GameState(2, BACKENDS[backend])
+    rng = random.Random(2)
+    for _ in play(state, rng, 200):
+        piece = state.current_tetromino
+        if not state.game_over:
+            assert state.board.drop_distance(piece) == state.board.scan_drop_distance(piece)
+
+def test_backends_agree():
+    # Same seed and inputs: the list board and the bitboard stay identical
+    list_state = GameState(3, create_board)
+    bit_state = GameState(3, create_bitboard)
+    for action in play(list_state, random.Random(3), 300):
+        bit_state.step(action)
+        for name in ("score", "lines_cleared", "level", "game_over"):
+            assert getattr(list_state, name) == getattr(bit_state, name)
+        assert position(list_state.current_tetromino) == position(bit_state.current_tetromino)
+        assert cells(list_state.board) == cells(bit_state.board)
+        if list_state.game_over:
+            break
+    assert list_state.lines_cleared > 0
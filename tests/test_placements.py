@@ -0,0 +1,94 @@
+import random
+from collections import deque
+
+import pytest
+
+from engine import (
+    GRID_WIDTH, GRID_HEIGHT, COLORS, ORIENTATIONS, LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP,
+    Tetromino, create_board,
+)
+from bitboard import WALL, BitBoard, create_bitboard
+from placements import enumerate_placements
+
+BACKENDS = {"list": create_board, "bitboard": create_bitboard}
+
+MOVES = {
+    LEFT: Tetromino.move_left,
+    RIGHT: Tetromino.move_right,
+    ROTATE: Tetromino.rotate,
+    SOFT_DROP: Tetromino.move_down,
+    HARD_DROP: Tetromino.hard_drop,
+}
+
+def piece_at(shape_idx, rotation, x, y):
+    piece = Tetromino(shape_idx)
+    piece.rotation, piece.x, piece.y = rotation, x, y
+    return piece
+
+def cells_of(piece):
+    return frozenset((piece.x + dx, piece.y + dy) for dx, dy in piece.cells)
+
+def brute_force(board, start):
+    # Breadth-first search over every Tetromino move; returns the cell sets
+    # of the states that cannot move down
+    if not start.is_valid_position(board):
+        return set()
+    seen = {(start.rotation, start.x, start.y)}
+    queue = deque(seen)
+    resting = set()
+    while queue:
+        state = queue.popleft()
+        for action in (LEFT, RIGHT, ROTATE, SOFT_DROP):
+            piece = piece_at(start.shape_idx, *state)
+            if MOVES[action](piece, board):
+                moved = (piece.rotation, piece.x, piece.y)
+                if moved not in seen:
+                    seen.add(moved)
+                    queue.append(moved)
+            elif action == SOFT_DROP:
+                resting.add(cells_of(piece))
+    return resting
+
+def random_board(factory, rng):
+    # Random junk in the lower rows leaves holes and overhangs; one gap per
+    # row keeps every row from being full
+    board = factory()
+    for y in range(GRID_HEIGHT - rng.randrange(GRID_HEIGHT - 2), GRID_HEIGHT):
+        gap = rng.randrange(GRID_WIDTH)
+        density = rng.choice((0.3, 0.6, 0.85))
+        for x in range(GRID_WIDTH):
+            if x != gap and rng.random() < density:
+                if isinstance(board, BitBoard):
+                    board.rows[y] |= 1 << (x + WALL)
+                    board.colors[y * GRID_WIDTH + x] = 1
+                else:
+                    board[y][x] = COLORS[0]
+    board.rebuild_index()
+    return board
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_placements_match_brute_force(backend):
+    rng = random.Random(5)
+    tucks = 0
+    for _ in range(150):
+        board = random_board(BACKENDS[backend], rng)
+        piece = Tetromino(rng.randrange(len(ORIENTATIONS)))
+        if rng.random() < 0.3:
+            piece.rotation = rng.randrange(4)
+            piece.x = rng.randrange(GRID_WIDTH - piece.orientation.width + 1)
+            piece.y = rng.randrange(4)
+
+        placements = enumerate_placements(board, piece)
+        found = [cells_of(piece_at(piece.shape_idx, p.rotation, p.x, p.y)) for p in placements]
+        assert len(set(found)) == len(found)
+        assert set(found) == brute_force(board, piece)
+
+        for placement, cells in zip(placements, found):
+            assert placement.path[-1] == HARD_DROP
+            moved = piece_at(piece.shape_idx, piece.rotation, piece.x, piece.y)
+            for action in placement.path:
+                MOVES[action](moved, board)
+            assert cells_of(moved) == cells
+            tucks += SOFT_DROP in placement.path
+    # The sample has to reach placements that need moves under the stack
+    assert tucks > 0
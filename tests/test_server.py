@@ -0,0 +1,73 @@
+import asyncio
+import random
+
+from engine import GRID_WIDTH, GRID_HEIGHT, LEFT, RIGHT, ROTATE, HARD_DROP, GameState
+from bitboard import create_bitboard
+from server import SpectatorClient, SpectatorServer, encode_board, state_fields
+
+def expected_board(state):
+    cells = encode_board(state.board)
+    return [list(cells[y * GRID_WIDTH:(y + 1) * GRID_WIDTH]) for y in range(GRID_HEIGHT)]
+
+async def wait_for(condition, timeout=10.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+async def follow(client, port, paused=None):
+    # Reads the stream; while paused is set the client stops reading after
+    # its first message, so the server's queue for it overflows
+    async for _ in client.watch(port=port):
+        if paused is not None:
+            await paused.wait()
+
+async def play(server, state, rng, steps):
+    # One publish per turn of the event loop, so a client that keeps
+    # reading never falls behind
+    for _ in range(steps):
+        state.step(rng.choice((LEFT, RIGHT, ROTATE, HARD_DROP)))
+        if state.game_over:
+            state.reset(rng.randrange(2 ** 32))
+        server.publish(state)
+        await asyncio.sleep(0)
+
+async def run_spectators():
+    server = SpectatorServer(port=0, queue_size=4)
+    await server.start()
+    state = GameState(1, create_bitboard)
+    rng = random.Random(1)
+    server.publish(state)
+    channel = server.channels["default"]
+
+    fast, slow = SpectatorClient(), SpectatorClient()
+    resume = asyncio.Event()
+    tasks = [asyncio.create_task(follow(fast, server.port)),
+             asyncio.create_task(follow(slow, server.port, resume))]
+    try:
+        await wait_for(lambda: len(channel.subscribers) == 2 and slow.seq is not None)
+        # Until the socket buffers for the paused client are full and the
+        # server has to drop its queue
+        for _ in range(100):
+            await play(server, state, rng, 500)
+            if any(subscriber.resyncs for subscriber in channel.subscribers):
+                break
+        await play(server, state, rng, 500)
+        await wait_for(lambda: fast.seq == channel.seq)
+        resume.set()
+        await wait_for(lambda: slow.seq == channel.seq)
+        return state, fast, slow, sorted(subscriber.resyncs for subscriber in channel.subscribers)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        server.server.close()
+        await server.server.wait_closed()
+
+def test_clients_rebuild_the_game():
+    state, fast, slow, resyncs = asyncio.run(run_spectators())
+    for client in (fast, slow):
+        assert client.board() == expected_board(state)
+        assert client.fields == state_fields(state)
+    # The paused client fell behind and was brought back with keyframes
+    assert resyncs[0] == 0 and resyncs[1] > 0
@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from engine import LEFT, RIGHT, ROTATE, SOFT_DROP, HARD_DROP, GRAVITY, GameState, create_board
+from bitboard import create_bitboard
+from snapshot import Snapshot, TranspositionCache, restore, snapshot
+from tournament import greedy_policy
+
+BACKENDS = {"list": create_board, "bitboard": create_bitboard}
+
+def actions(state, rng, pieces):
+    # Greedy placements mixed with random inputs, planned lazily, so the
+    # caller has to step state with each action before asking for the next
+    for _ in range(pieces):
+        if state.game_over:
+            return
+        if rng.random() < 0.9:
+            moves = greedy_policy(state, rng) or (HARD_DROP,)
+        else:
+            moves = [rng.choice((LEFT, RIGHT, ROTATE, SOFT_DROP, GRAVITY))
+                     for _ in range(rng.randrange(8))] + [HARD_DROP]
+        yield from moves
+
+def play(state, moves):
+    for action in moves:
+        state.step(action)
+    return state
+
+def assert_exact(a, b):
+    # Equality covers the position; the generator state and index must match too
+    assert a == b
+    assert a.rng_state == b.rng_state
+    assert a.index == b.index
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_restore_replays_exactly(backend):
+    state = GameState(1, BACKENDS[backend])
+    rng = random.Random(1)
+    play(state, actions(state, rng, 20))
+    start = snapshot(state)
+
+    moves = []
+    for action in actions(state, rng, 30):
+        state.step(action)
+        moves.append(action)
+    first = snapshot(state)
+    assert state.level > start.level and not state.game_over
+
+    restore(state, start)
+    assert_exact(snapshot(state), start)
+    assert_exact(snapshot(play(state, moves)), first)
+
+    # New pieces come from the restored generator as well
+    play(state, (HARD_DROP,) * 3)
+    again = restore(GameState(2, BACKENDS[backend]), first)
+    assert_exact(snapshot(play(again, (HARD_DROP,) * 3)), snapshot(state))
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_unchanged_rows_are_shared(backend):
+    state = GameState(3, BACKENDS[backend])
+    play(state, (HARD_DROP,) * 4)
+    previous = snapshot(state)
+
+    # Nothing locked: the whole board is reused
+    state.step(LEFT)
+    assert snapshot(state, previous).rows is previous.rows
+
+    state.step(HARD_DROP)
+    snap = snapshot(state, previous)
+    changed = [y for y, (old, new) in enumerate(zip(previous.rows, snap.rows)) if old != new]
+    assert changed
+    for y, (old, new) in enumerate(zip(previous.rows, snap.rows)):
+        if y not in changed:
+            assert new is old
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_snapshot_is_immutable(backend):
+    snap = snapshot(GameState(4, BACKENDS[backend]))
+    with pytest.raises(AttributeError):
+        snap.score = 100
+    with pytest.raises(AttributeError):
+        snap.new_field = 1
+    with pytest.raises(AttributeError):
+        del snap.rows
+    assert snap.score == 0
+
+def test_transposition_cache_evicts_least_recently_used():
+    rows = ((bytes(10),) * 20)
+    snaps = [Snapshot(rows, (0, 0, 3, 0), 1, score=score) for score in range(4)]
+    cache = TranspositionCache(maxsize=3)
+    for snap in snaps[:3]:
+        cache.put(snap, snap.score)
+
+    # Reading the oldest entry makes the second one least recently used
+    assert cache.get(snaps[0]) == 0
+    cache.put(snaps[3], 3)
+    assert len(cache) == 3
+    assert snaps[1] not in cache
+    assert [snap in cache for snap in (snaps[0], snaps[2], snaps[3])] == [True] * 3
+
+    # An equal snapshot built separately hits the same entry
+    assert cache.get(Snapshot(rows, (0, 0, 3, 0), 1, score=2)) == 2
+    assert cache.lookup(snaps[1], lambda snap: -1) == -1
+    assert snaps[0] not in cache
+    assert (cache.hits, cache.misses) == (2, 1)
@@ -0,0 +1,30 @@
+import os
+
+import numpy as np
+
+import sound_bank
+from sound_bank import render, synthesize
+
+def test_cache_returns_fresh_samples(tmp_path):
+    cached = render("move", cache_dir=str(tmp_path))
+    assert np.array_equal(render("move", cache_dir=str(tmp_path)), cached)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_cache_key_covers_defaults(tmp_path, monkeypatch):
+    render("move", cache_dir=str(tmp_path))
+    monkeypatch.setitem(sound_bank.DEFAULTS, "fade", 0.02)
+    fresh = synthesize(sound_bank.SOUND_BANK["move"])
+    assert np.array_equal(render("move", cache_dir=str(tmp_path)), fresh)
+
+def test_cache_key_covers_synth_version(tmp_path, monkeypatch):
+    render("move", cache_dir=str(tmp_path))
+    monkeypatch.setattr(sound_bank, "SYNTH_VERSION", sound_bank.SYNTH_VERSION + 1)
+    render("move", cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_no_fade():
+    # Zero or shorter than one sample
+    for fade in (0, 1e-6):
+        samples = synthesize({"wave": "tone", "freq": 220, "duration": 0.1, "fade": fade})
+        assert len(samples) == 4410
+        assert samples.any()
@@ -0,0 +1,11 @@
+import pytest
+
+from replay import MAX_SEED
+from tetris import parse_args
+
+def test_seed_range():
+    assert parse_args(["--seed", "0"]).seed == 0
+    assert parse_args(["--seed", str(MAX_SEED)]).seed == MAX_SEED
+    for bad in ("-1", str(MAX_SEED + 1), "abc"):
+        with pytest.raises(SystemExit):
+            parse_args(["--seed", bad])
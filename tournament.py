@@ -0,0 +1,173 @@
+import argparse
+import math
+import os
+import queue
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from engine import GameState
+from bitboard import create_bitboard
+from placements import enumerate_placements
+from bot import evaluate, search
+
+# Plays complete games with each placement policy across a range of seeds
+# on a process pool. A policy picks the action path for the current piece;
+# the game itself runs through GameState.step(), so scoring, line clears
+# and levels follow the normal rules. Games are handed to the workers one
+# at a time and each result is written as soon as its game finishes, with
+# only a bounded number of games in flight, so memory stays flat however
+# many games are played. Aggregates are running sums, never per-game lists.
+
+def random_policy(state, rng):
+    placements = enumerate_placements(state.board, state.current_tetromino)
+    return rng.choice(placements).path if placements else None
+
+def greedy_policy(state, rng):
+    placements = enumerate_placements(state.board, state.current_tetromino)
+    if not placements:
+        return None
+    return max(placements, key=lambda p: evaluate(p.board, p.lines_cleared)).path
+
+def lookahead_policy(state, rng):
+    # The autoplay bot without a deadline, so results do not depend on load
+    return search(state.board, state.current_tetromino, state.next_tetromino.shape_idx,
+                  math.inf)[0]
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+    "lookahead": lookahead_policy,
+}
+
+FIELDS = ("policy", "seed", "score", "lines", "pieces", "seconds", "pieces_per_sec", "game_over")
+
+def play_game(policy_name, seed, max_pieces):
+    policy = POLICIES[policy_name]
+    rng = random.Random(seed)
+    state = GameState(seed, create_bitboard)
+    pieces = 0
+    start = time.perf_counter()
+    while not state.game_over and pieces < max_pieces:
+        path = policy(state, rng)
+        if path is None:
+            break
+        for action in path:
+            state.step(action)
+        pieces += 1
+    seconds = time.perf_counter() - start
+    return (policy_name, seed, state.score, state.lines_cleared, pieces, seconds,
+            pieces / seconds if seconds else 0.0, state.game_over)
+
+class Stats:
+    # Running count, mean, variance (Welford), min and max of one value
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def stdev(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+class Summary:
+    METRICS = ("score", "lines", "pieces", "pieces_per_sec")
+
+    def __init__(self):
+        self.stats = {}
+        self.game_overs = {}
+
+    def add(self, result):
+        row = dict(zip(FIELDS, result))
+        policy = row["policy"]
+        if policy not in self.stats:
+            self.stats[policy] = {metric: Stats() for metric in self.METRICS}
+            self.game_overs[policy] = 0
+        for metric, stats in self.stats[policy].items():
+            stats.add(row[metric])
+        self.game_overs[policy] += row["game_over"]
+
+    def lines(self):
+        for policy, metrics in self.stats.items():
+            games = metrics["score"].count
+            yield f"{policy}: {games} games, {self.game_overs[policy]} ended in game over"
+            for metric, stats in metrics.items():
+                yield (f"  {metric:15s} mean {stats.mean:12.1f}  sd {stats.stdev():10.1f}  "
+                       f"min {stats.min:10.1f}  max {stats.max:10.1f}")
+
+def parse_seeds(text):
+    # "N" means seeds 0..N-1, "A:B" means A..B-1
+    start, _, stop = text.rpartition(":")
+    return range(int(start or 0), int(stop))
+
+def format_row(result):
+    return ",".join(f"{value:.4f}" if isinstance(value, float) else str(int(value))
+                    if isinstance(value, bool) else str(value) for value in result)
+
+def run(policies, seeds, jobs=None, max_pieces=10000, output=sys.stdout):
+    # Games are submitted from this thread and at most 4 per worker are
+    # pending at once. A failed game or Ctrl-C raises here, and the pool is
+    # terminated with nothing left blocked on the way out.
+    summary = Summary()
+    workers = jobs or os.cpu_count() or 1
+    results = queue.SimpleQueue()
+    pending = 0
+
+    def collect():
+        result = results.get()
+        if isinstance(result, BaseException):
+            raise result
+        summary.add(result)
+        print(format_row(result), file=output)
+        output.flush()
+
+    with Pool(workers) as pool:
+        print(",".join(FIELDS), file=output)
+        for policy in policies:
+            for seed in seeds:
+                if pending == 4 * workers:
+                    collect()
+                    pending -= 1
+                pool.apply_async(play_game, (policy, seed, max_pieces),
+                                 callback=results.put, error_callback=results.put)
+                pending += 1
+        for _ in range(pending):
+            collect()
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Tetris bot policies against each other")
+    parser.add_argument("policies", nargs="+", choices=sorted(POLICIES), metavar="POLICY",
+                        help=f"one or more of: {', '.join(sorted(POLICIES))}")
+    parser.add_argument("--seeds", type=parse_seeds, default=parse_seeds("100"),
+                        help="N for seeds 0..N-1, or START:STOP (default: 100)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--max-pieces", type=int, default=10000,
+                        help="stop a game after this many pieces (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="write per-game CSV here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.output:
+        with open(args.output, "w") as f:
+            summary = run(args.policies, args.seeds, args.jobs, args.max_pieces, f)
+    else:
+        summary = run(args.policies, args.seeds, args.jobs, args.max_pieces)
+    for line in summary.lines():
+        print(line, file=sys.stderr)
+    print(f"done in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())